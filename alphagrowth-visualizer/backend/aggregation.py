@@ -0,0 +1,198 @@
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from cooccurrence import cooccurrence_edges
+from identity import IdentityResolver
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = 'aggregate_state.json'
+STATE_FORMAT = 2
+
+def write_atomic(path: str, data: Union[str, bytes]):
+    """Write `data` to a temp file next to `path` and rename it into place"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def file_signature(path: str) -> List[Any]:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime]
+
+class AggregateState:
+    """Running aggregates behind participants_data.json and network_data.json.
+
+    Holds per-participant counts (indexed by the integer ids of an
+    IdentityResolver, so in first-appearance order), the participants seen in
+    each space and the co-participation edge weights, plus a record of which
+    sources have been folded in. Saved as JSON between builds so a new
+    snapshot only costs its own rows.
+    """
+
+    def __init__(self):
+        self.sources: Dict[str, Any] = {}
+        self.participants: List[Dict[str, Any]] = []
+        self.identities = IdentityResolver()
+        self.space_members: Dict[str, Set[int]] = defaultdict(set)
+        self.edges: Optional[Dict[Tuple[int, int], int]] = None  # None until built from space_members
+        self.listed_spaces: Set[str] = set()
+        self.appearance_rows = 0
+
+    def add_row(self, row):
+        """Fold one appearance row (space_url, role, name, alphagrowth_link, twitter_link) into the aggregates"""
+        name = row['name']
+        role = row['role'].lower()  # Convert to lowercase
+        if role == 'speakers':  # Fix plural form
+            role = 'speaker'
+
+        index = self.identities.resolve(name, row['alphagrowth_link'], row['twitter_link'])
+        if index == len(self.participants):
+            self.participants.append({
+                'name': name,
+                'spaces': 0,
+                'roles': set(),
+                'twitter': '',
+                'alphagrowth_link': '',
+                'host_spaces': 0,
+                'speaker_spaces': 0
+            })
+        stats = self.participants[index]
+        stats['name'] = name  # The most recent display name wins, like the links
+
+        # Only count unique spaces
+        members = self.space_members[row['space_url']]
+        if index not in members:
+            if self.edges is not None:
+                # Incremental update: one more shared space with everyone already in this one
+                for other in members:
+                    pair = (other, index) if other < index else (index, other)
+                    self.edges[pair] = self.edges.get(pair, 0) + 1
+            members.add(index)
+            stats['spaces'] += 1
+
+        stats['roles'].add(role)
+
+        # Count spaces by role
+        if role == 'host':
+            stats['host_spaces'] += 1
+        elif role == 'speaker':
+            stats['speaker_spaces'] += 1
+
+        if row['twitter_link']:
+            stats['twitter'] = row['twitter_link']
+        if row['alphagrowth_link']:
+            stats['alphagrowth_link'] = row['alphagrowth_link']
+        self.appearance_rows += 1
+
+    def add_rows(self, rows: Iterable) -> int:
+        count = 0
+        for row in rows:
+            self.add_row(row)
+            count += 1
+        return count
+
+    def build_edges(self):
+        """Compute all edge weights at once from space membership (used after a full rebuild)"""
+        participant_codes = np.fromiter((index for members in self.space_members.values() for index in members),
+                                        dtype=np.int64)
+        space_codes = np.repeat(np.arange(len(self.space_members)),
+                                [len(members) for members in self.space_members.values()])
+        sources, targets, weights = cooccurrence_edges(participant_codes, space_codes, len(self.participants))
+        self.edges = dict(zip(zip(sources.tolist(), targets.tolist()), weights.tolist()))
+
+    def participants_data(self) -> List[Dict[str, Any]]:
+        participants_data = []
+        names = self.identities.names_by_id()
+        for idx, stats in enumerate(self.participants, start=1):
+            # Determine role
+            roles = stats['roles']
+            if len(roles) > 1:
+                role = 'both'
+            else:
+                role = list(roles)[0]
+
+            participants_data.append({
+                'id': str(idx),  # Generate sequential IDs
+                'name': stats['name'],
+                'role': role,
+                'spaces': stats['spaces'],
+                'host_spaces': stats['host_spaces'],
+                'speaker_spaces': stats['speaker_spaces'],
+                'twitter': stats['twitter'],
+                'alphagrowth_link': stats['alphagrowth_link'],
+                'aliases': [name for name in names[idx - 1] if name != stats['name']]
+            })
+        return participants_data
+
+    def links(self, participants_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One link per pair of participants who shared a space, weighted by the number of shared spaces"""
+        if self.edges is None:
+            self.build_edges()
+        return [
+            {'source': participants_data[source]['id'], 'target': participants_data[target]['id'], 'value': weight}
+            for (source, target), weight in sorted(self.edges.items())
+        ]
+
+    def to_json(self) -> Dict[str, Any]:
+        if self.edges is None:
+            self.build_edges()
+        return {
+            'format': STATE_FORMAT,
+            'sources': self.sources,
+            'appearance_rows': self.appearance_rows,
+            'identities': self.identities.to_json(),
+            'participants': [[p['name'], p['spaces'], sorted(p['roles']), p['twitter'], p['alphagrowth_link'],
+                              p['host_spaces'], p['speaker_spaces']]
+                             for p in self.participants],
+            'space_members': {url: sorted(members) for url, members in self.space_members.items()},
+            'edges': [[source, target, weight] for (source, target), weight in sorted(self.edges.items())],
+            'listed_spaces': sorted(self.listed_spaces),
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'AggregateState':
+        state = cls()
+        state.sources = data['sources']
+        state.appearance_rows = data['appearance_rows']
+        state.identities = IdentityResolver.from_json(data['identities'])
+        for name, spaces, roles, twitter, alphagrowth_link, host_spaces, speaker_spaces in data['participants']:
+            state.participants.append({
+                'name': name,
+                'spaces': spaces,
+                'roles': set(roles),
+                'twitter': twitter,
+                'alphagrowth_link': alphagrowth_link,
+                'host_spaces': host_spaces,
+                'speaker_spaces': speaker_spaces
+            })
+        for url, members in data['space_members'].items():
+            state.space_members[url] = set(members)
+        state.edges = {(source, target): weight for source, target, weight in data['edges']}
+        state.listed_spaces = set(data['listed_spaces'])
+        return state
+
+    def save(self, path: str):
+        write_atomic(path, json.dumps(self.to_json()))
+        logger.info(f"Saved aggregate state to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> Optional['AggregateState']:
+        """Load saved state, or None if there is none or it cannot be used"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('format') != STATE_FORMAT:
+                logger.info(f"Ignoring aggregate state with format {data.get('format')}")
+                return None
+            return cls.from_json(data)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not load aggregate state from {path}: {str(e)}")
+            return None
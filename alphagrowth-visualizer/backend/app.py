@@ -1,12 +1,22 @@
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify, send_from_directory, send_file, make_response, request
 from flask_cors import CORS
+import hashlib
 import json
 import os
 import logging
 import traceback
 from collections import defaultdict
-from datetime import datetime
 import pandas as pd
+from database import find_database
+from data_cache import DatasetCache
+from participant_index import ParticipantIndex, ParticipantListing, clean_participants, SORT_KEYS, ROLE_FILTERS, LISTING_FIELDS
+from payloads import EncodedPayload, CACHE_CONTROL
+from graph_format import BINARY_FILENAME, encode_network, open_if_current
+from graph_analytics import METRICS_FILENAME
+from network_index import NetworkIndex, MAX_EGO_DEPTH
+from search import SearchIndex, DEFAULT_LIMIT, MAX_LIMIT
+from stats import STATS_FILENAME, find_last_run_date
+import threading
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,7 +33,7 @@ CORS(app, resources={
         ],
         "methods": ["GET", "POST", "OPTIONS"],
         "allow_headers": ["Content-Type", "Authorization"],
-        "expose_headers": ["Content-Type", "Authorization"],
+        "expose_headers": ["Content-Type", "Authorization", "X-Total-Count", "X-Next-Cursor"],
         "supports_credentials": True,
         "max_age": 3600
     }
@@ -38,8 +48,8 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Credentials', 'true')
     return response
 
-def get_data_dir():
-    """Get the absolute path to the data directory."""
+def find_data_dir():
+    """Probe the possible data directory locations and return the first valid one."""
     # Get the directory where app.py is located
     current_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -93,94 +103,251 @@ def get_data_dir():
     logger.error(error_msg)
     raise FileNotFoundError(error_msg)
 
-def load_json_data(filename):
-    """Load JSON data from the data directory."""
-    try:
-        data_dir = get_data_dir()
-        file_path = os.path.join(data_dir, filename)
-        
-        logger.info(f"Attempting to load: {file_path}")
+_data_dir = None
+_data_dir_lock = threading.Lock()
+
+def get_data_dir():
+    """Get the absolute path to the data directory, resolved once per process."""
+    global _data_dir
+    if _data_dir is None:
+        with _data_dir_lock:
+            if _data_dir is None:
+                _data_dir = find_data_dir()
+    return _data_dir
+
+dataset_cache = DatasetCache(get_data_dir)
+
+BINARY_MIMETYPE = 'application/vnd.alphagrowth.graph'
+
+def parse_json_data(filename, raw, expected_type=list):
+    """Parse and validate the raw contents of a JSON data file."""
+    data = json.loads(raw)
+    
+    # Validate data structure
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON string from {filename}: {str(e)}")
+            raise
+            
+    if not isinstance(data, expected_type):
+        error_msg = f"Data from {filename} is not a {expected_type}: {type(data)}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
         
+    logger.info(f"Successfully loaded {filename} with {len(data)} items")
+    return data
+
+def load_dataset(filename, expected_type=list):
+    """Load a JSON data file through the process-wide cache; it is re-read only when it changes."""
+    try:
+        file_path = dataset_cache.path(filename)
         if not os.path.exists(file_path):
             error_msg = f"Required file not found: {filename}"
             logger.error(error_msg)
             raise FileNotFoundError(error_msg)
-            
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            
-            # Validate data structure
-            if isinstance(data, str):
-                try:
-                    data = json.loads(data)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON string from {filename}: {str(e)}")
-                    raise
-                    
-            if not isinstance(data, list):
-                error_msg = f"Data from {filename} is not a list: {type(data)}"
-                logger.error(error_msg)
-                raise ValueError(error_msg)
-                
-            logger.info(f"Successfully loaded {filename} with {len(data)} items")
-            return data
-            
+        return dataset_cache.get(filename, lambda raw: parse_json_data(filename, raw, expected_type))
     except Exception as e:
         logger.error(f"Error loading {filename}: {str(e)}")
         logger.error(traceback.format_exc())
         raise
 
+def load_json_data(filename, expected_type=list):
+    """Load JSON data from the data directory."""
+    return load_dataset(filename, expected_type).data
+
+def binary_network_response(dataset):
+    """Serve the compact binary network: the memory-mapped build output when it matches, else encoded once per version."""
+    etag = f"{dataset.version}-binary"
+    path = dataset_cache.path(BINARY_FILENAME)
+    binary = dataset.derived('binary_file', lambda _: open_if_current(path, dataset.version))
+    # Reopened and compared with the mapped file, so a rebuild in between can't send new bytes under this ETag
+    binary_file = binary.open_file(path) if binary is not None else None
+    if binary_file is not None:
+        # Sent straight from the file, so the body is never copied into Python
+        response = send_file(binary_file, mimetype=BINARY_MIMETYPE, etag=etag, conditional=True)
+        if response.status_code == 200:
+            response.content_length = binary.buffer.nbytes
+    else:
+        encoded = dataset.derived('binary', lambda network: encode_network(network, dataset.version))
+        response = make_response(encoded)
+        response.mimetype = BINARY_MIMETYPE
+        response.set_etag(etag)
+        response = response.make_conditional(request)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+NETWORK_QUERY_PARAMS = ['max_nodes', 'min_edge_weight', 'community', 'ego', 'depth']
+
+def parse_network_args(args):
+    """Validate the /api/network subgraph parameters; raises ValueError with a client-facing message."""
+    try:
+        max_nodes = int(args['max_nodes']) if args.get('max_nodes') else None
+        min_edge_weight = int(args.get('min_edge_weight') or 1)
+        community = int(args['community']) if args.get('community') else None
+        depth = int(args.get('depth') or 1)
+    except ValueError:
+        raise ValueError("max_nodes, min_edge_weight, community and depth must be integers")
+    if max_nodes is not None and max_nodes < 1:
+        raise ValueError("max_nodes must be at least 1")
+    if not 1 <= depth <= MAX_EGO_DEPTH:
+        raise ValueError(f"depth must be between 1 and {MAX_EGO_DEPTH}")
+    ego = args.get('ego') or None
+    if 'depth' in args and ego is None:
+        raise ValueError("depth requires ego")
+
+    return {'max_nodes': max_nodes, 'min_edge_weight': min_edge_weight, 'community': community,
+            'ego': ego, 'depth': depth}
+
+def subgraph_response(dataset, query, network_format):
+    """Answer a filtered /api/network request from the network's CSR index."""
+    index = dataset.derived('network_index', NetworkIndex)
+    communities = None
+    if query['community'] is not None:
+        loaded = load_graph_metrics()
+        if loaded is None:
+            return jsonify({"error": METRICS_UNAVAILABLE}), 503
+        metrics_dataset, metrics = loaded
+        communities = metrics_dataset.derived('community_labels', lambda _: index.community_labels(metrics))
+    try:
+        subgraph = index.subgraph(communities=communities, **query)
+    except KeyError:
+        return jsonify({"error": f"Unknown ego node {query['ego']}"}), 404
+
+    if network_format == 'binary':
+        response = make_response(encode_network(subgraph, dataset.version))
+        response.mimetype = BINARY_MIMETYPE
+    else:
+        response = jsonify(subgraph)
+    response.set_etag(f"{dataset.version}-{hashlib.sha256(request.query_string).hexdigest()[:8]}")
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response.make_conditional(request)
+
 @app.route('/api/network')
 def get_network():
     try:
-        network = load_json_data('network_data.json')
-        if not network:
+        # data_processor / convert_csv_to_json write {'nodes': [...], 'links': [...]}
+        dataset = load_dataset('network_data.json', (list, dict))
+        if not dataset.data:
             return jsonify({"error": "No network data available"}), 500
-        return jsonify(network)
+        network_format = request.args.get('format', 'json')
+        if network_format not in ('json', 'binary'):
+            return jsonify({"error": "format must be 'json' or 'binary'"}), 400
+        if any(param in request.args for param in NETWORK_QUERY_PARAMS):
+            try:
+                query = parse_network_args(request.args)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            return subgraph_response(dataset, query, network_format)
+        if network_format == 'binary':
+            return binary_network_response(dataset)
+        payload = dataset.derived('payload', lambda network: EncodedPayload(network, dataset.version))
+        return payload.response(request)
     except Exception as e:
         logger.error(f"Error in get_network: {str(e)}")
         logger.error(traceback.format_exc())
         return jsonify({"error": "Internal server error"}), 500
 
+LISTING_PARAMS = ['limit', 'offset', 'cursor', 'sort', 'role', 'fields']
+
+def parse_listing_args(args, version):
+    """Validate the /api/participants query parameters; raises ValueError with a client-facing message."""
+    sort = args.get('sort') or None
+    if sort is not None and sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {SORT_KEYS}")
+
+    role = args.get('role') or None
+    if role is not None and role not in ROLE_FILTERS:
+        raise ValueError(f"role must be one of {list(ROLE_FILTERS)}")
+
+    fields = [field for field in args.get('fields', '').split(',') if field] or None
+    unknown = [field for field in fields or [] if field not in LISTING_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}; available: {LISTING_FIELDS}")
+
+    offset = args.get('offset', '0')
+    if args.get('cursor'):
+        # Cursors are only valid for the data version they were issued for
+        cursor_version, _, offset = args['cursor'].partition(':')
+        if cursor_version != version:
+            raise ValueError("Cursor is from an older data version; restart from the first page")
+    try:
+        limit = int(args['limit']) if args.get('limit') else None
+        offset = int(offset)
+    except ValueError:
+        raise ValueError("limit, offset and cursor must be integers")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    return {'role': role, 'sort': sort, 'offset': offset, 'limit': limit, 'fields': fields}
+
+METRICS_UNAVAILABLE = "Graph metrics have not been built for the current network; run the data build"
+
+def load_graph_metrics():
+    """The build's graph_metrics.json as (Dataset, metrics), or None when it is missing or for another network version.
+
+    Metrics take seconds to compute on a large network, so they are never computed inside a request.
+    """
+    if not os.path.exists(dataset_cache.path(METRICS_FILENAME)):
+        logger.error(f"{METRICS_FILENAME} not found; run the data build to materialize it")
+        return None
+    network = load_dataset('network_data.json', (list, dict))
+    metrics = load_dataset(METRICS_FILENAME, dict)
+    if metrics.data.get('data_version') != network.version:
+        logger.error(f"{METRICS_FILENAME} is for data version {metrics.data.get('data_version')}, "
+                     f"network_data.json is {network.version}; run the data build to refresh it")
+        return None
+    return metrics, metrics.data
+
+@app.route('/api/network/metrics')
+def get_network_metrics():
+    try:
+        loaded = load_graph_metrics()
+        if loaded is None:
+            return jsonify({"error": METRICS_UNAVAILABLE}), 503
+        dataset, metrics = loaded
+        payload = dataset.derived('metrics_payload', lambda _: EncodedPayload(metrics, f"{metrics['data_version']}-metrics"))
+        return payload.response(request)
+    except Exception as e:
+        logger.error(f"Error in get_network_metrics: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route('/api/participants')
 def get_participants():
     try:
-        participants = load_json_data('participants_data.json')
-        if not participants:
+        dataset = load_dataset('participants_data.json')
+        if not dataset.data:
             return jsonify({"error": "No participant data available"}), 500
         
-        # Clean and validate each participant
-        cleaned_participants = []
-        for participant in participants:
-            try:
-                # Ensure all required fields are present and valid
-                cleaned = {
-                    'id': str(participant.get('id', '')),
-                    'name': str(participant.get('name', '')),
-                    'role': str(participant.get('role', 'speaker')),
-                    'spaces': int(participant.get('spaces', 0)),
-                    'speaker_spaces': int(participant.get('speaker_spaces', 0)),
-                    'twitter': str(participant.get('twitter', '')) if participant.get('twitter') else None
-                }
-                
-                # Calculate host_spaces
-                cleaned['host_spaces'] = cleaned['spaces'] - cleaned['speaker_spaces']
-                
-                # Validate role
-                if cleaned['role'] not in ['host', 'speaker', 'both']:
-                    cleaned['role'] = 'both' if cleaned['host_spaces'] > 0 and cleaned['speaker_spaces'] > 0 else \
-                                    'host' if cleaned['host_spaces'] > 0 else 'speaker'
-                
-                cleaned_participants.append(cleaned)
-            except (ValueError, TypeError) as e:
-                logger.error(f"Error cleaning participant data: {str(e)}")
-                continue
-        
-        # Log the first few participants for debugging
-        logger.info(f"First 3 participants: {cleaned_participants[:3]}")
-        logger.info(f"Total participants: {len(cleaned_participants)}")
-        
-        return jsonify(cleaned_participants)
+        # Cleaned and serialized once per data version
+        cleaned_participants = dataset.derived('cleaned_participants', clean_participants)
+        if not any(param in request.args for param in LISTING_PARAMS):
+            payload = dataset.derived('participants_payload',
+                                      lambda _: EncodedPayload(cleaned_participants, dataset.version))
+            return payload.response(request)
+
+        try:
+            query = parse_listing_args(request.args, dataset.version)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        listing = dataset.derived('participant_listing', lambda _: ParticipantListing(cleaned_participants))
+        rows, total = listing.page(**query)
+
+        # Same plain list body as the unpaginated response; paging state travels in headers
+        response = jsonify(rows)
+        response.headers['X-Total-Count'] = str(total)
+        next_offset = query['offset'] + len(rows)
+        # Only when the page advanced, so following cursors always terminates
+        if query['limit'] is not None and rows and next_offset < total:
+            response.headers['X-Next-Cursor'] = f"{dataset.version}:{next_offset}"
+        response.set_etag(f"{dataset.version}-{hashlib.sha256(request.query_string).hexdigest()[:8]}")
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        return response.make_conditional(request)
     except Exception as e:
         logger.error(f"Error in get_participants: {str(e)}")
         logger.error(traceback.format_exc())
@@ -188,81 +355,58 @@ def get_participants():
 
 @app.route('/api/participants/<participant_id>')
 def get_participant_details(participant_id):
-    participants = load_json_data('participants_data.json')
-    if not participants:
+    dataset = load_dataset('participants_data.json')
+    if not dataset.data:
         return jsonify({"error": "No participant data available"}), 500
     
-    participant = next((p for p in participants if p.get('id') == participant_id), None)
+    index = dataset.derived('participant_index', ParticipantIndex)
+    participant = index.lookup(participant_id)
     if participant:
-        return jsonify(participant)
+        # Details are still useful without the graph metrics
+        node_metrics, metrics_version = None, 'none'
+        try:
+            loaded = load_graph_metrics()
+            if loaded is not None:
+                metrics = loaded[1]
+                node_metrics = metrics['nodes'].get(str(participant.get('id')))
+                metrics_version = metrics['data_version']
+        except Exception as e:
+            logger.error(f"Graph metrics unavailable: {str(e)}")
+        response = jsonify({**participant, 'metrics': node_metrics})
+        response.set_etag(f"{dataset.version}-{metrics_version}-{participant.get('id')}")
+        return response.make_conditional(request)
     return jsonify({'error': 'Participant not found'}), 404
 
-def get_total_spaces():
-    """Get the total number of spaces from total_spaces.txt."""
+@app.route('/api/search')
+def search_participants():
+    """Typeahead search over participant names, handles and former names: /api/search?q=<text>&limit=<n>"""
     try:
-        data_dir = get_data_dir()
-        file_path = os.path.join(data_dir, 'total_spaces.txt')
-        
-        logger.info(f"Looking for total_spaces.txt at: {file_path}")
-        if not os.path.exists(file_path):
-            logger.error(f"total_spaces.txt not found at: {file_path}")
-            # Try to find the file in the repository
-            repo_root = '/opt/render/project/src'
-            for root, dirs, files in os.walk(repo_root):
-                if 'total_spaces.txt' in files:
-                    found_path = os.path.join(root, 'total_spaces.txt')
-                    logger.info(f"Found total_spaces.txt in repository at: {found_path}")
-                    file_path = found_path
-                    break
-            else:
-                logger.error(f"Could not find total_spaces.txt anywhere in the repository")
-                return None
-            
-        with open(file_path, 'r') as f:
-            total_spaces = int(f.read().strip())
-            logger.info(f"Total spaces from total_spaces.txt: {total_spaces}")
-            return total_spaces
-            
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "q is required"}), 400
+        try:
+            limit = int(request.args.get('limit') or DEFAULT_LIMIT)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        if not 1 <= limit <= MAX_LIMIT:
+            return jsonify({"error": f"limit must be between 1 and {MAX_LIMIT}"}), 400
+
+        dataset = load_dataset('participants_data.json')
+        index = dataset.derived('search_index', SearchIndex)
+        response = jsonify({'query': query, 'results': index.search(query, limit)})
+        response.set_etag(f"{dataset.version}-{hashlib.sha256(request.query_string).hexdigest()[:8]}")
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        return response.make_conditional(request)
     except Exception as e:
-        logger.error(f"Error reading total_spaces.txt: {str(e)}")
+        logger.error(f"Error in search_participants: {str(e)}")
         logger.error(traceback.format_exc())
-        return None
+        return jsonify({"error": "Internal server error"}), 500
 
 def get_last_run_date():
     """Get the date of the most recent data collection."""
     try:
         data_dir = get_data_dir()
-        logger.info(f"Looking for participants files in: {data_dir}")
-        
-        # List all files in the data directory
-        all_files = os.listdir(data_dir)
-        logger.info(f"All files in data directory: {all_files}")
-        
-        # Look for both participants_*.csv and participants.csv
-        participants_files = [f for f in all_files if (f.startswith('participants_') and f.endswith('.csv')) or f == 'participants.csv']
-        logger.info(f"Found participants CSV files: {participants_files}")
-        
-        if not participants_files:
-            logger.warning("No participants CSV files found!")
-            return None
-            
-        # Get the latest file
-        latest_file = sorted(participants_files)[-1]
-        logger.info(f"Latest participants file: {latest_file}")
-        
-        # Extract date from filename (participants_YYYYMMDD.csv)
-        if latest_file.startswith('participants_'):
-            date_str = latest_file.split('_')[1].split('.')[0]
-            # Convert to readable format
-            date = datetime.strptime(date_str, '%Y%m%d')
-            return date.strftime('%B %d, %Y')
-        else:
-            # If it's just participants.csv, use its modification time
-            file_path = os.path.join(data_dir, latest_file)
-            mod_time = os.path.getmtime(file_path)
-            date = datetime.fromtimestamp(mod_time)
-            return date.strftime('%B %d, %Y')
-            
+        return find_last_run_date(data_dir, find_database([data_dir]))
     except Exception as e:
         logger.error(f"Error getting last run date: {str(e)}")
         logger.error(traceback.format_exc())
@@ -270,128 +414,20 @@ def get_last_run_date():
 
 @app.route('/api/stats')
 def get_stats():
+    """Serve the stats materialized by the data build (scripts/convert_csv_to_json.py)."""
     try:
-        data_dir = get_data_dir()
-        stats_file = os.path.join(data_dir, 'stats.json')
+        if not os.path.exists(dataset_cache.path(STATS_FILENAME)):
+            logger.error(f"{STATS_FILENAME} not found; run the data build to materialize it")
+            return jsonify({"error": "Stats have not been built yet"}), 503
         
-        # Try to load pre-calculated stats
-        if os.path.exists(stats_file):
-            try:
-                with open(stats_file, 'r') as f:
-                    stats = json.load(f)
-                    logger.info(f"Loaded pre-calculated stats from {stats_file}")
-                    return jsonify(stats)
-            except Exception as e:
-                logger.error(f"Error loading stats.json: {str(e)}")
-                # Continue with calculation if file is corrupted
-        
-        # If stats.json doesn't exist or is corrupted, calculate stats
-        participants = load_json_data('participants_data.json')
-        if not participants:
-            return jsonify({"error": "No participant data available"}), 500
-
-        # Get total spaces from total_spaces.txt
-        total_spaces = get_total_spaces()
-        if total_spaces is None:
-            return jsonify({"error": "Could not read total spaces from total_spaces.txt"}), 500
-
-        # Get last run date
-        last_run_date = get_last_run_date()
-
-        # Clean and validate participants first
-        cleaned_participants = []
-        for participant in participants:
-            try:
-                cleaned = {
-                    'id': str(participant.get('id', '')),
-                    'name': str(participant.get('name', '')),
-                    'role': str(participant.get('role', 'speaker')),
-                    'spaces': int(participant.get('spaces', 0)),
-                    'speaker_spaces': int(participant.get('speaker_spaces', 0)),
-                    'twitter': str(participant.get('twitter', '')) if participant.get('twitter') else None
-                }
-                
-                # Calculate host_spaces
-                cleaned['host_spaces'] = cleaned['spaces'] - cleaned['speaker_spaces']
-                
-                # Validate role
-                if cleaned['role'] not in ['host', 'speaker', 'both']:
-                    cleaned['role'] = 'both' if cleaned['host_spaces'] > 0 and cleaned['speaker_spaces'] > 0 else \
-                                    'host' if cleaned['host_spaces'] > 0 else 'speaker'
-                
-                cleaned_participants.append(cleaned)
-            except (ValueError, TypeError) as e:
-                logger.error(f"Error cleaning participant data: {str(e)}")
-                continue
-
-        # Calculate stats
-        total_participants = len(cleaned_participants)
-        
-        # Count unique roles
-        hosts = [p for p in cleaned_participants if p['role'] in ['host', 'both']]
-        speakers = [p for p in cleaned_participants if p['role'] in ['speaker', 'both']]
-        both = [p for p in cleaned_participants if p['role'] == 'both']
-        
-        total_hosts = len(hosts)
-        total_speakers = len(speakers)
-        total_both = len(both)
-        
-        # Calculate spaces
-        total_host_spaces = sum(p['host_spaces'] for p in cleaned_participants)
-        total_speaker_spaces = sum(p['speaker_spaces'] for p in cleaned_participants)
+        dataset = load_dataset(STATS_FILENAME, dict)
+        participants = load_dataset('participants_data.json')
+        if dataset.data.get('data_version') != participants.version:
+            logger.warning(f"{STATS_FILENAME} was built for data version {dataset.data.get('data_version')}, "
+                           f"participants_data.json is {participants.version}")
         
-        # Find most active host and speaker
-        most_active_host = max(hosts, key=lambda x: x['host_spaces']) if hosts else {'name': 'N/A', 'host_spaces': 0}
-        most_active_speaker = max(speakers, key=lambda x: x['speaker_spaces']) if speakers else {'name': 'N/A', 'speaker_spaces': 0}
-
-        # Calculate average participants per space from participants.csv
-        participants_file = os.path.join(data_dir, 'participants.csv')
-        if os.path.exists(participants_file):
-            try:
-                # Read the first line to get total rows
-                with open(participants_file, 'r') as f:
-                    total_rows = sum(1 for _ in f) - 1  # Subtract header row
-                
-                # Calculate average
-                average_participants_per_space = total_rows / total_spaces if total_spaces > 0 else 0
-                logger.info(f"Calculated average participants per space: {average_participants_per_space:.2f}")
-            except Exception as e:
-                logger.error(f"Error calculating average participants per space: {str(e)}")
-                average_participants_per_space = 0
-        else:
-            average_participants_per_space = 0
-            logger.warning("participants.csv not found, using default average of 0")
-
-        # Prepare stats
-        stats = {
-            'total_participants': total_participants,
-            'total_hosts': total_hosts,
-            'total_speakers': total_speakers,
-            'total_both': total_both,
-            'total_spaces': total_spaces,
-            'total_host_spaces': total_host_spaces,
-            'total_speaker_spaces': total_speaker_spaces,
-            'average_participants_per_space': round(average_participants_per_space, 2),
-            'most_active_host': {
-                'name': most_active_host['name'],
-                'spaces': most_active_host['host_spaces']
-            },
-            'most_active_speaker': {
-                'name': most_active_speaker['name'],
-                'spaces': most_active_speaker['speaker_spaces']
-            },
-            'last_run_date': last_run_date
-        }
-
-        # Save stats to file for future use
-        try:
-            with open(stats_file, 'w') as f:
-                json.dump(stats, f)
-            logger.info(f"Saved stats to {stats_file}")
-        except Exception as e:
-            logger.error(f"Error saving stats to file: {str(e)}")
-
-        return jsonify(stats)
+        payload = dataset.derived('payload', lambda stats: EncodedPayload(stats, dataset.version))
+        return payload.response(request)
     except Exception as e:
         logger.error(f"Error in get_stats: {str(e)}")
         logger.error(traceback.format_exc())
@@ -414,5 +450,11 @@ def get_last_run():
 def index():
     return "AlphaGrowth Network API is running."
 
+# Resolve the data directory at startup rather than on the first request
+try:
+    get_data_dir()
+except FileNotFoundError:
+    logger.error("Data directory not available at startup; will retry on first request")
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 10000))) 
\ No newline at end of file
@@ -0,0 +1,63 @@
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+Edges = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+def incidence_matrix(participant_codes: np.ndarray, space_codes: np.ndarray,
+                     n_participants: Optional[int] = None, n_spaces: Optional[int] = None) -> sparse.csr_matrix:
+    """Binary participant x space matrix; repeated appearances in one space count once"""
+    participant_codes = np.asarray(participant_codes, dtype=np.int64)
+    space_codes = np.asarray(space_codes, dtype=np.int64)
+    if n_participants is None:
+        n_participants = int(participant_codes.max()) + 1 if len(participant_codes) else 0
+    if n_spaces is None:
+        n_spaces = int(space_codes.max()) + 1 if len(space_codes) else 0
+    data = np.ones(len(participant_codes), dtype=np.int32)
+    matrix = sparse.csr_matrix((data, (participant_codes, space_codes)), shape=(n_participants, n_spaces))
+    matrix.data[:] = 1  # csr_matrix sums duplicate entries
+    return matrix
+
+def cooccurrence_edges(participant_codes: np.ndarray, space_codes: np.ndarray,
+                       n_participants: Optional[int] = None, min_weight: int = 1) -> Edges:
+    """Weighted co-participation edges from A·Aᵀ.
+
+    Returns (sources, targets, weights) with source < target, one entry per
+    pair of participants that shared at least `min_weight` distinct spaces,
+    ordered by (source, target).
+    """
+    incidence = incidence_matrix(participant_codes, space_codes, n_participants)
+    shared = sparse.triu(incidence @ incidence.T, k=1).tocoo()
+    keep = shared.data >= min_weight
+    sources, targets, weights = shared.row[keep], shared.col[keep], shared.data[keep]
+    order = np.lexsort((targets, sources))
+    return sources[order].astype(np.int64), targets[order].astype(np.int64), weights[order].astype(np.int64)
+
+def edges_from_space_lists(space_lists: Sequence[Iterable[str]], min_weight: int = 1) -> Edges:
+    """Co-participation edges for participants given as lists of space URLs (participant i = space_lists[i])"""
+    participant_codes = np.repeat(np.arange(len(space_lists)), [len(spaces) for spaces in space_lists])
+    urls: List[str] = [url for spaces in space_lists for url in spaces]
+    space_codes = pd.factorize(np.asarray(urls, dtype=object))[0] if urls else np.zeros(0, dtype=np.int64)
+    return cooccurrence_edges(participant_codes, space_codes, len(space_lists), min_weight)
+
+def top_k_per_node(edges: Edges, k: int) -> Edges:
+    """Keep the heaviest edges while no node exceeds k edges.
+
+    Edges are taken greedily by descending weight (ties by source, then
+    target), so every node ends up with at most k links and each link it
+    keeps is one of its strongest still available.
+    """
+    sources, targets, weights = edges
+    order = np.lexsort((targets, sources, -weights))
+    degree = {}
+    kept = []
+    for i in order.tolist():
+        s, t = int(sources[i]), int(targets[i])
+        if degree.get(s, 0) < k and degree.get(t, 0) < k:
+            kept.append(i)
+            degree[s] = degree.get(s, 0) + 1
+            degree[t] = degree.get(t, 0) + 1
+    kept = np.asarray(kept, dtype=np.int64)
+    return sources[kept], targets[kept], weights[kept]
@@ -0,0 +1,84 @@
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+def data_version(raw: bytes) -> str:
+    """Content hash of a data file, used in ETags and build stamps"""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+class Dataset:
+    """One loaded version of a data file plus anything derived from it.
+
+    `version` is a hash of the file contents, so it changes exactly when the
+    data does and can be used directly in ETags and stats stamps.
+    """
+
+    def __init__(self, data: Any, version: str, signature: Tuple):
+        self.data = data
+        self.version = version
+        self.signature = signature
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def derived(self, key: str, builder: Callable[[Any], Any]) -> Any:
+        """Compute builder(data) once per dataset version and memoize it under `key`.
+
+        A None result is not memoized, so a builder that found nothing is tried again on the next call.
+        """
+        if key not in self._derived:
+            with self._lock:
+                if key not in self._derived:
+                    value = builder(self.data)
+                    if value is None:
+                        return None
+                    self._derived[key] = value
+        return self._derived[key]
+
+class DatasetCache:
+    """Process-wide cache of parsed data files, reloaded only when the file changes.
+
+    Each lookup costs one os.stat; the file is re-read only when its
+    (mtime, inode, size) signature differs from the cached one, and a
+    per-file lock makes sure concurrent requests trigger a single reload.
+    """
+
+    def __init__(self, data_dir_resolver: Callable[[], str]):
+        self._resolve_data_dir = data_dir_resolver
+        self._datasets: Dict[str, Dataset] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, filename: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(filename, threading.Lock())
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self._resolve_data_dir(), filename)
+
+    def get(self, filename: str, loader: Callable[[bytes], Any]) -> Dataset:
+        """Return the current Dataset for `filename`, parsing it with loader(raw_bytes) when it changed"""
+        file_path = self.path(filename)
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+
+        dataset = self._datasets.get(filename)
+        if dataset is not None and dataset.signature == signature:
+            return dataset
+
+        with self._lock_for(filename):
+            # Another thread may have reloaded the file while we waited for the lock
+            dataset = self._datasets.get(filename)
+            if dataset is not None and dataset.signature == signature:
+                return dataset
+
+            logger.info(f"Loading {file_path}")
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            dataset = Dataset(loader(raw), data_version(raw), signature)
+            self._datasets[filename] = dataset
+            logger.info(f"Loaded {filename} (version {dataset.version})")
+            return dataset
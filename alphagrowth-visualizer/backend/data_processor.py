@@ -1,16 +1,27 @@
+import numpy as np
 import pandas as pd
 import json
-from collections import defaultdict
 from typing import Dict, List, Any
 import os
 from datetime import datetime
 import logging
 import re
+from database import find_database, load_appearances, count_spaces
+from aggregation import write_atomic
+from data_cache import data_version
+from cooccurrence import edges_from_space_lists, top_k_per_node
+from graph_format import write_network_files
+from graph_analytics import materialize_graph_metrics
+from graph_layout import apply_layout
+from identity import IdentityResolver
+from stats import find_last_run_date, materialize_stats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MAX_LINKS_PER_NODE = 5
+
 def sanitize_name(name: str) -> str:
     """Convert a name to a valid ID by removing special characters and spaces"""
     # Remove emojis and special characters
@@ -22,9 +33,11 @@ def sanitize_name(name: str) -> str:
     return name
 
 class ParticipantNode:
-    def __init__(self, name: str):
+    def __init__(self, name: str, participant_id: str = None):
         self.original_name = name
-        self.name = sanitize_name(name)
+        # The node id: the resolved participant id, or for ad hoc nodes the sanitized name
+        self.name = participant_id if participant_id is not None else sanitize_name(name)
+        self.aliases: List[str] = []
         self.twitter = None
         self.alphagrowth_link = None
         self.host_spaces: List[str] = []
@@ -40,6 +53,20 @@ class ParticipantNode:
         self.total_spaces = len(self.host_spaces) + len(self.speaker_spaces)
         self._update_color()
 
+    @classmethod
+    def from_spaces(cls, name: str, host_spaces: List[str], speaker_spaces: List[str],
+                    twitter: str = None, alphagrowth_link: str = None,
+                    participant_id: str = None) -> 'ParticipantNode':
+        """Build a node from its complete space lists, computing totals and color once"""
+        node = cls(name, participant_id)
+        node.twitter = twitter
+        node.alphagrowth_link = alphagrowth_link
+        node.host_spaces = host_spaces
+        node.speaker_spaces = speaker_spaces
+        node.total_spaces = len(host_spaces) + len(speaker_spaces)
+        node._update_color()
+        return node
+
     def _update_color(self):
         """Update node color based on roles"""
         if self.host_spaces and self.speaker_spaces:
@@ -53,6 +80,7 @@ class ParticipantNode:
         return {
             'name': self.original_name,
             'id': self.name,
+            'aliases': self.aliases,
             'twitter': self.twitter,
             'alphagrowth_link': self.alphagrowth_link,
             'host_spaces': self.host_spaces,
@@ -61,23 +89,106 @@ class ParticipantNode:
             'node_color': self.node_color
         }
 
+SOURCE_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+
 def find_latest_participants_file() -> str:
     """Find the most recent participants CSV file in the data directory"""
-    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
+    data_dir = SOURCE_DATA_DIR
     files = [f for f in os.listdir(data_dir) if f.startswith('participants_') and f.endswith('.csv')]
     if not files:
         raise FileNotFoundError("No participants CSV file found")
     return os.path.join(data_dir, sorted(files)[-1])
 
-def process_participants_data(csv_path: str = None) -> Dict[str, ParticipantNode]:
-    """Process the participants CSV and create a network of participants"""
+def load_participants_frame(csv_path: str = None, db_path: str = None) -> pd.DataFrame:
+    """Load appearance rows from the scraper database, or from a participants CSV.
+
+    An explicit csv_path wins; otherwise the database is used when it exists and
+    the latest participants CSV is the fallback.
+    """
     if csv_path is None:
+        db_path = db_path or find_database()
+        if db_path:
+            logger.info(f"Processing data from database: {db_path}")
+            return load_appearances(db_path)
         csv_path = find_latest_participants_file()
     
     logger.info(f"Processing data from: {csv_path}")
+    return pd.read_csv(csv_path)
+
+def _optional_str(value: Any) -> Any:
+    return None if pd.isna(value) else str(value)
+
+def _split_by_code(codes: np.ndarray, values: np.ndarray, n_groups: int) -> List[List[str]]:
+    """Split values (already ordered by code) into one list per code 0..n_groups-1"""
+    bounds = np.searchsorted(codes, np.arange(n_groups + 1))
+    return [values[bounds[i]:bounds[i + 1]].tolist() for i in range(n_groups)]
+
+def resolve_identities(df: pd.DataFrame, resolver: IdentityResolver = None) -> np.ndarray:
+    """Integer participant id of every appearance row (see identity.IdentityResolver)"""
+    resolver = resolver or IdentityResolver()
+    columns = ['name', 'alphagrowth_link', 'twitter_link']
+    # One group per distinct (name, links) combination, numbered in order of first appearance
+    groups = df.groupby(columns, dropna=False, sort=False).ngroup().to_numpy()
+    first_rows = np.unique(groups, return_index=True)[1]
+
+    # Resolve each combination once, in order of first appearance
+    rows = df[columns].to_numpy(dtype=object)[first_rows]
+    ids = np.array([resolver.resolve(*row) for row in rows.tolist()], dtype=np.int64)
+    return ids[groups]
+
+def build_participant_nodes(df: pd.DataFrame) -> Dict[str, ParticipantNode]:
+    """Group appearance rows into one ParticipantNode per resolved participant.
+
+    Rows are tied to participants by AlphaGrowth slug / twitter handle, not
+    display name. Vectorized equivalent of walking the rows in order and
+    calling add_space: participants keep first-appearance order, space lists
+    keep row order, the display name is the most recent one and twitter /
+    alphagrowth links come from each participant's first row. Nodes are keyed
+    by id ("1", "2", ...).
+    """
+    # Skip rows with NaN values in required fields
+    df = df.dropna(subset=['name', 'role', 'space_url'])
+    df = df.assign(name=df['name'].astype(str))
+    
+    # Ids are dense and numbered in order of first appearance, which is the dict order we want
+    codes = resolve_identities(df)
+    n_participants = int(codes.max()) + 1 if len(codes) else 0
+    first_rows = np.unique(codes, return_index=True)[1]
+    last_rows = len(codes) - 1 - np.unique(codes[::-1], return_index=True)[1]
+    row_names = df['name'].to_numpy()
+    names = row_names[last_rows]
+    # Every other name each participant appeared under, in order of first use
+    name_codes, unique_names = pd.factorize(row_names)
+    alias_rows = np.sort(np.unique(codes * len(unique_names) + name_codes, return_index=True)[1])
+    aliases = [[] for _ in range(n_participants)]
+    for code, alias in zip(codes[alias_rows].tolist(), row_names[alias_rows].tolist()):
+        if alias != names[code]:
+            aliases[code].append(alias)
     
-    # Read the CSV
-    df = pd.read_csv(csv_path)
+    # Normalize role to singular (e.g., 'hosts' -> 'host', 'speakers' -> 'speaker')
+    is_host = (df['role'].astype(str).str.rstrip('s').str.lower() == 'host').to_numpy()
+    space_urls = df['space_url'].astype(str).to_numpy()
+    
+    # Stable sort by participant so each participant's spaces stay in row order
+    order = np.argsort(codes, kind='stable')
+    codes, is_host, space_urls = codes[order], is_host[order], space_urls[order]
+    host_spaces = _split_by_code(codes[is_host], space_urls[is_host], n_participants)
+    speaker_spaces = _split_by_code(codes[~is_host], space_urls[~is_host], n_participants)
+    
+    twitter_links = df['twitter_link'].to_numpy()[first_rows]
+    alphagrowth_links = df['alphagrowth_link'].to_numpy()[first_rows]
+    
+    participants = {}
+    for i, name in enumerate(names.tolist()):
+        node = ParticipantNode.from_spaces(name, host_spaces[i], speaker_spaces[i], _optional_str(twitter_links[i]),
+                                           _optional_str(alphagrowth_links[i]), participant_id=str(i + 1))
+        node.aliases = aliases[i]
+        participants[node.name] = node
+    return participants
+
+def process_participants_data(csv_path: str = None, db_path: str = None) -> Dict[str, ParticipantNode]:
+    """Process the participants CSV and create a network of participants"""
+    df = load_participants_frame(csv_path, db_path)
     
     # Debug: Print column names and first few rows
     logger.info(f"\nCSV Columns: {df.columns.tolist()}")
@@ -86,25 +197,7 @@ def process_participants_data(csv_path: str = None) -> Dict[str, ParticipantNode
     # Debug: Print unique role values
     logger.info(f"\nUnique role values: {df['role'].unique()}")
     
-    # Create participant nodes
-    participants: Dict[str, ParticipantNode] = {}
-    
-    # Process each row
-    for _, row in df.iterrows():
-        # Skip rows with NaN values in required fields
-        if pd.isna(row['name']) or pd.isna(row['role']) or pd.isna(row['space_url']):
-            continue
-            
-        name = str(row['name'])
-        # Normalize role to singular (e.g., 'hosts' -> 'host', 'speakers' -> 'speaker')
-        role = str(row['role']).rstrip('s').lower()
-        
-        if name not in participants:
-            participants[name] = ParticipantNode(name)
-            participants[name].twitter = str(row['twitter_link']) if not pd.isna(row['twitter_link']) else None
-            participants[name].alphagrowth_link = str(row['alphagrowth_link']) if not pd.isna(row['alphagrowth_link']) else None
-        
-        participants[name].add_space(str(row['space_url']), role)
+    participants = build_participant_nodes(df)
     
     logger.info(f"\nProcessed {len(participants)} unique participants")
     return participants
@@ -127,28 +220,16 @@ def generate_network_data(participants: Dict[str, ParticipantNode]) -> Dict[str,
             'twitter': participant.twitter
         })
     
-    # Create links between participants who have been in the same spaces
-    space_participants = defaultdict(set)
-    for participant in top_participants:
-        for space in participant.host_spaces + participant.speaker_spaces:
-            space_participants[space].add(participant.name)
-    
-    # Generate links between participants in the same spaces
-    # Limit to 5 links per participant to keep the network manageable
-    participant_links = defaultdict(int)
-    for space, participants_in_space in space_participants.items():
-        participants_list = list(participants_in_space)
-        for i in range(len(participants_list)):
-            for j in range(i + 1, len(participants_list)):
-                p1, p2 = participants_list[i], participants_list[j]
-                if participant_links[p1] < 5 and participant_links[p2] < 5:
-                    links.append({
-                        'source': p1,
-                        'target': p2,
-                        'value': 1
-                    })
-                    participant_links[p1] += 1
-                    participant_links[p2] += 1
+    # Link participants who have been in the same spaces, weighted by how many they shared.
+    # Keep the strongest 5 links per participant to keep the network manageable
+    sources, targets, weights = top_k_per_node(
+        edges_from_space_lists([p.host_spaces + p.speaker_spaces for p in top_participants]), MAX_LINKS_PER_NODE)
+    for source, target, weight in zip(sources.tolist(), targets.tolist(), weights.tolist()):
+        links.append({
+            'source': top_participants[source].name,
+            'target': top_participants[target].name,
+            'value': weight
+        })
     
     return {
         'nodes': nodes,
@@ -164,23 +245,40 @@ def generate_network_data(participants: Dict[str, ParticipantNode]) -> Dict[str,
         }
     }
 
-def save_processed_data(participants: Dict[str, ParticipantNode], output_dir: str = None):
-    """Save processed data to JSON files"""
+def stats_records(participants: Dict[str, ParticipantNode]) -> List[Dict[str, Any]]:
+    """Participants in the spaces / speaker_spaces / role shape that stats.compute_stats counts"""
+    records = []
+    for p in participants.values():
+        role = 'both' if p.host_spaces and p.speaker_spaces else 'host' if p.host_spaces else 'speaker'
+        records.append({'name': p.original_name, 'role': role, 'spaces': p.total_spaces,
+                        'speaker_spaces': len(p.speaker_spaces)})
+    return records
+
+def save_processed_data(participants: Dict[str, ParticipantNode], output_dir: str = None, db_path: str = None):
+    """Save processed data to JSON files, plus the stats.json and graph_metrics.json stamped for them"""
     if output_dir is None:
         output_dir = os.path.join(os.path.dirname(__file__), 'data')
     
     os.makedirs(output_dir, exist_ok=True)
     
     # Save network data
-    network_data = generate_network_data(participants)
+    network_data = apply_layout(generate_network_data(participants))
     network_file = os.path.join(output_dir, 'network_data.json')
-    with open(network_file, 'w') as f:
-        json.dump(network_data, f, indent=2)
+    network_version = write_network_files(output_dir, network_data)
+    materialize_graph_metrics(output_dir, network_data, network_version)
     
     # Save detailed participant data
     participants_file = os.path.join(output_dir, 'participants_data.json')
-    with open(participants_file, 'w') as f:
-        json.dump([p.to_dict() for p in participants.values()], f, indent=2)
+    participants_text = json.dumps([p.to_dict() for p in participants.values()], indent=2)
+    write_atomic(participants_file, participants_text)
+    
+    # Stamped with the participants data version, so /api/stats serves stats for this build
+    db_path = db_path or find_database()
+    scraped_spaces = {url for p in participants.values() for url in p.host_spaces + p.speaker_spaces}
+    total_spaces = count_spaces(db_path) if db_path else len(scraped_spaces)
+    total_appearances = sum(p.total_spaces for p in participants.values())
+    materialize_stats(output_dir, stats_records(participants), data_version(participants_text.encode('utf-8')),
+                      total_spaces, total_appearances, find_last_run_date(SOURCE_DATA_DIR, db_path))
     
     logger.info(f"Saved network data to: {network_file}")
     logger.info(f"Saved detailed participant data to: {participants_file}")
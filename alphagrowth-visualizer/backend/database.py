@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Iterator, List, Optional, Tuple
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DB_FILENAME = 'alphagrowth.db'
+
+# Same column layout as the participants_*.csv snapshots
+APPEARANCES_QUERY = """
+SELECT s.url AS space_url, a.role, p.name, p.alphagrowth_link, p.twitter_link
+FROM appearances a
+JOIN spaces s ON s.id = a.space_id
+JOIN participants p ON p.id = a.participant_id
+ORDER BY a.rowid
+"""
+
+def find_database(extra_dirs: Optional[List[str]] = None) -> Optional[str]:
+    """Locate the scraper's SQLite database, or return None if it has not been built"""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    candidates = [os.environ.get('ALPHAGROWTH_DB')]
+    candidates += [os.path.join(d, DB_FILENAME) for d in (extra_dirs or [])]
+    candidates += [
+        os.path.join(os.path.dirname(os.path.dirname(backend_dir)), 'data', DB_FILENAME),  # Scraper data directory
+        os.path.join(backend_dir, 'data', DB_FILENAME),  # Copied next to the backend
+    ]
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+def connect(db_path: str) -> sqlite3.Connection:
+    # Read-only: the scrapers are the only writers
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+def load_appearances(db_path: str) -> pd.DataFrame:
+    """Load every appearance as a DataFrame with the participants CSV columns"""
+    with closing(connect(db_path)) as conn:
+        return pd.read_sql_query(APPEARANCES_QUERY, conn)
+
+# Appearances written after a given rowid, for incremental builds
+APPEARANCES_RANGE_QUERY = APPEARANCES_QUERY.replace('ORDER BY', 'WHERE a.rowid > ? AND a.rowid <= ?\nORDER BY')
+
+def iter_appearances(db_path: str, after_rowid: int = 0, up_to_rowid: Optional[int] = None) -> Iterator[sqlite3.Row]:
+    """Stream appearance rows (CSV column names, NULL for missing links) without loading them all"""
+    with closing(connect(db_path)) as conn:
+        conn.row_factory = sqlite3.Row
+        if after_rowid or up_to_rowid is not None:
+            upper = up_to_rowid if up_to_rowid is not None else conn.execute('SELECT MAX(rowid) FROM appearances').fetchone()[0]
+            yield from conn.execute(APPEARANCES_RANGE_QUERY, (after_rowid, upper or 0))
+        else:
+            yield from conn.execute(APPEARANCES_QUERY)
+
+def appearance_watermark(db_path: str, up_to_rowid: Optional[int] = None) -> Tuple[int, int]:
+    """(max rowid, number of rows) of appearances, optionally only those at or below up_to_rowid.
+
+    Rescrapes delete and re-insert a space's rows, so a drop in the row count
+    below an old watermark means earlier rows changed. The scraper's
+    appearance ids are AUTOINCREMENT (rowid is that id), so re-inserted rows
+    always land above the old watermark instead of reusing the deleted ids.
+    """
+    with closing(connect(db_path)) as conn:
+        if up_to_rowid is None:
+            max_rowid, rows = conn.execute('SELECT MAX(rowid), COUNT(*) FROM appearances').fetchone()
+        else:
+            max_rowid, rows = conn.execute('SELECT MAX(rowid), COUNT(*) FROM appearances WHERE rowid <= ?',
+                                           (up_to_rowid,)).fetchone()
+        return max_rowid or 0, rows
+
+def count_appearances(db_path: str) -> int:
+    with closing(connect(db_path)) as conn:
+        return conn.execute('SELECT COUNT(*) FROM appearances').fetchone()[0]
+
+def count_spaces(db_path: str) -> int:
+    with closing(connect(db_path)) as conn:
+        return conn.execute('SELECT COUNT(*) FROM spaces').fetchone()[0]
+
+def last_scraped_at(db_path: str) -> Optional[str]:
+    """ISO timestamp of the most recent participant scrape"""
+    with closing(connect(db_path)) as conn:
+        return conn.execute('SELECT MAX(scraped_at) FROM appearances').fetchone()[0]
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from aggregation import write_atomic
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILENAME = 'graph_metrics.json'
+PAGERANK_DAMPING = 0.85
+BETWEENNESS_SAMPLES = 256
+LABEL_PROPAGATION_ROUNDS = 50
+SEED = 0  # sampling is seeded so a build is reproducible
+
+def network_csr(network: Dict[str, Any]) -> Tuple[List[Any], sparse.csr_matrix]:
+    """Node ids in node-list order and the symmetric weighted adjacency matrix of the network"""
+    ids = [node['id'] for node in network['nodes']]
+    positions = {}
+    for i, node_id in enumerate(ids):
+        positions.setdefault(str(node_id), i)
+
+    links = network.get('links', [])
+    sources = np.fromiter((positions[str(link['source'])] for link in links), dtype=np.int64, count=len(links))
+    targets = np.fromiter((positions[str(link['target'])] for link in links), dtype=np.int64, count=len(links))
+    weights = np.fromiter((link.get('value', 1) for link in links), dtype=np.float64, count=len(links))
+    keep = sources != targets
+    sources, targets, weights = sources[keep], targets[keep], weights[keep]
+
+    n = len(ids)
+    # Both directions; repeated links between the same pair add up
+    adjacency = sparse.csr_matrix((np.concatenate([weights, weights]),
+                                   (np.concatenate([sources, targets]), np.concatenate([targets, sources]))),
+                                  shape=(n, n))
+    adjacency.sum_duplicates()
+    return ids, adjacency
+
+def pagerank(adjacency: sparse.csr_matrix, damping: float = PAGERANK_DAMPING,
+             tol: float = 1e-10, max_iter: int = 200) -> np.ndarray:
+    """Weighted PageRank by power iteration; dangling nodes spread their rank uniformly"""
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    transition_t = (sparse.diags(inverse) @ adjacency).T.tocsr()
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        updated = damping * (transition_t @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+        if np.abs(updated - rank).sum() < tol:
+            return updated
+        rank = updated
+    return rank
+
+def approximate_betweenness(adjacency: sparse.csr_matrix, samples: int = BETWEENNESS_SAMPLES,
+                            seed: int = SEED, batch_size: int = 64) -> np.ndarray:
+    """Normalized shortest-path betweenness estimated from sampled sources (Brandes on hop distance).
+
+    All sampled sources are processed together, level by level, with sparse
+    matrix products instead of one BFS per source.
+    """
+    n = adjacency.shape[0]
+    if n < 3:
+        return np.zeros(n)
+    structure = (adjacency > 0).astype(np.float64).tocsr()
+    rng = np.random.default_rng(seed)
+    sources = np.arange(n) if samples >= n else rng.choice(n, samples, replace=False)
+
+    # Keep the dense n x batch work arrays to a few million entries
+    batch_size = max(1, min(batch_size, 4_000_000 // n))
+    centrality = np.zeros(n)
+    for start in range(0, len(sources), batch_size):
+        batch = sources[start:start + batch_size]
+        columns = np.arange(len(batch))
+        # sigma[v, j]: number of shortest paths from batch[j] to v; depth -1 = not reached yet
+        sigma = np.zeros((n, len(batch)))
+        sigma[batch, columns] = 1
+        depth = np.full((n, len(batch)), -1, dtype=np.int64)
+        depth[batch, columns] = 0
+        frontier = sigma.copy()
+        level = 0
+        while frontier.any():
+            level += 1
+            reached = structure @ frontier
+            reached[depth >= 0] = 0
+            depth[reached > 0] = level
+            sigma += reached
+            frontier = reached
+
+        # Dependency accumulation from the deepest level back to the sources
+        delta = np.zeros_like(sigma)
+        safe_sigma = np.where(sigma > 0, sigma, 1)
+        for current in range(level - 1, 0, -1):
+            children = np.where(depth == current + 1, (1 + delta) / safe_sigma, 0)
+            delta += np.where(depth == current, sigma * (structure @ children), 0)
+        centrality += delta.sum(axis=1)
+
+    return centrality * (n / len(sources)) / ((n - 1) * (n - 2))
+
+def row_argmax(matrix: sparse.csr_matrix) -> np.ndarray:
+    """Column of the largest entry in each row (smallest column on ties, 0 for empty rows)"""
+    matrix.sort_indices()
+    counts = np.diff(matrix.indptr)
+    best = np.zeros(matrix.shape[0], dtype=np.int64)
+    nonempty = counts > 0
+    if not nonempty.any():
+        return best
+    row_max = np.maximum.reduceat(matrix.data, matrix.indptr[:-1][nonempty])
+    row_of_entry = np.repeat(np.arange(matrix.shape[0]), counts)
+    candidates = np.flatnonzero(matrix.data == np.repeat(row_max, counts[nonempty]))
+    rows, first = np.unique(row_of_entry[candidates], return_index=True)
+    best[rows] = matrix.indices[candidates[first]]
+    return best
+
+def label_propagation(adjacency: sparse.csr_matrix, max_rounds: int = LABEL_PROPAGATION_ROUNDS,
+                      seed: int = SEED) -> np.ndarray:
+    """Weighted label-propagation communities, numbered by size (0 = largest).
+
+    Each round a random half of the nodes adopts the label carrying the most
+    edge weight among its neighbours (keeping its own label on ties), which
+    avoids the oscillation of fully synchronous updates.
+    """
+    n = adjacency.shape[0]
+    labels = np.arange(n)
+    rng = np.random.default_rng(seed)
+    has_neighbours = np.diff(adjacency.indptr) > 0
+    rows = np.arange(n)
+    for _ in range(max_rounds):
+        membership = sparse.csr_matrix((np.ones(n), (rows, labels)), shape=(n, n))
+        # A small bonus for the current label keeps it on ties
+        scores = (adjacency @ membership + membership * 1e-6).tocsr()
+        best = row_argmax(scores)
+        changing = has_neighbours & (best != labels)
+        if not changing.any():
+            break
+        labels = np.where(changing & (rng.random(n) < 0.5), best, labels)
+
+    _, codes, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    # Renumber communities by size, largest first (ties by first member)
+    order = np.lexsort((np.arange(len(sizes)), -sizes))
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[order] = np.arange(len(sizes))
+    return rank[codes]
+
+def core_numbers(adjacency: sparse.csr_matrix) -> np.ndarray:
+    """k-core number of every node, by repeatedly peeling nodes whose remaining degree is below k"""
+    n = adjacency.shape[0]
+    structure = (adjacency > 0).astype(np.int64).tocsr()
+    degree = np.asarray(structure.sum(axis=1)).ravel()
+    core = np.zeros(n, dtype=np.int64)
+    alive = np.ones(n, dtype=bool)
+    k = 0
+    while alive.any():
+        k = max(k, int(degree[alive].min()))
+        while True:
+            peel = alive & (degree <= k)
+            if not peel.any():
+                break
+            core[peel] = k
+            alive &= ~peel
+            degree -= structure @ peel.astype(np.int64)
+    return core
+
+def compute_graph_metrics(network: Dict[str, Any], data_version: str) -> Dict[str, Any]:
+    """All per-node metrics for a network, keyed by node id"""
+    ids, adjacency = network_csr(network)
+    degree = np.diff(adjacency.indptr)
+    weighted_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    ranks = pagerank(adjacency)
+    betweenness = approximate_betweenness(adjacency)
+    communities = label_propagation(adjacency)
+    cores = core_numbers(adjacency)
+
+    nodes = {}
+    for i, node_id in enumerate(ids):
+        nodes.setdefault(str(node_id), {
+            'degree': int(degree[i]),
+            'weighted_degree': float(weighted_degree[i]),
+            'pagerank': float(ranks[i]),
+            'betweenness': float(betweenness[i]),
+            'community': int(communities[i]),
+            'core': int(cores[i]),
+        })
+    community_sizes = np.bincount(communities) if len(ids) else np.zeros(0, dtype=np.int64)
+    return {
+        'data_version': data_version,
+        'generated_at': datetime.now().isoformat(),
+        'parameters': {
+            'pagerank_damping': PAGERANK_DAMPING,
+            'betweenness_samples': min(BETWEENNESS_SAMPLES, len(ids)),
+            'seed': SEED,
+        },
+        'summary': {
+            'nodes': len(ids),
+            'edges': int(adjacency.nnz // 2),
+            'communities': len(community_sizes),
+            'largest_communities': community_sizes[:10].tolist(),
+            'max_core': int(cores.max()) if len(ids) else 0,
+        },
+        'nodes': nodes,
+    }
+
+def materialize_graph_metrics(output_dir: str, network: Dict[str, Any], data_version: str) -> Dict[str, Any]:
+    """Compute metrics in the data build and write graph_metrics.json, stamped with the network data version"""
+    start = datetime.now()
+    metrics = compute_graph_metrics(network, data_version)
+    write_atomic(os.path.join(output_dir, METRICS_FILENAME), json.dumps(metrics))
+    logger.info(f"Saved graph metrics for {metrics['summary']['nodes']} nodes in {(datetime.now() - start).total_seconds():.1f}s")
+    return metrics
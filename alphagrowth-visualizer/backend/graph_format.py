@@ -0,0 +1,137 @@
+"""Compact binary encoding of network_data.json.
+
+Layout (all integers little-endian):
+
+    offset  size  field
+    0       8     magic b'AGGRAPH\\0'
+    8       4     format version (uint32, currently 1)
+    12      4     node count (uint32)
+    16      4     edge count (uint32)
+    20      4     node table length in bytes (uint32)
+    24      16    data version of the network_data.json it was built from (ASCII hex)
+    40      n     node table: UTF-8 JSON of the network object without 'links'
+                  ({'nodes': [...], 'metadata': ...}), padded with spaces to a multiple of 8
+    ...     4*E   edge sources (uint32 positions in the node list)
+    ...     4*E   edge targets (uint32)
+    ...     4*E   edge weights (uint32)
+
+The edge arrays are aligned, so clients can wrap them in typed arrays and the
+backend can memory-map them without copying.
+"""
+import json
+import logging
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+import numpy as np
+
+from aggregation import write_atomic
+from data_cache import data_version
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'AGGRAPH\0'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIII16s')
+EDGE_DTYPE = np.dtype('<u4')
+BINARY_FILENAME = 'network_data.bin'
+JSON_FILENAME = 'network_data.json'
+
+def file_identity(stat: os.stat_result) -> Tuple:
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+def encode_network(network: Dict[str, Any], source_version: str) -> bytes:
+    """Encode a {'nodes', 'links', ...} network as the binary layout above"""
+    nodes = network['nodes']
+    positions = {}
+    for i, node in enumerate(nodes):
+        positions.setdefault(str(node['id']), i)
+
+    links = network.get('links', [])
+    sources = np.fromiter((positions[str(link['source'])] for link in links), dtype=EDGE_DTYPE, count=len(links))
+    targets = np.fromiter((positions[str(link['target'])] for link in links), dtype=EDGE_DTYPE, count=len(links))
+    weights = np.fromiter((link.get('value', 1) for link in links), dtype=EDGE_DTYPE, count=len(links))
+
+    table = json.dumps({key: value for key, value in network.items() if key != 'links'},
+                       separators=(',', ':')).encode('utf-8')
+    table += b' ' * (-len(table) % 8)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(nodes), len(links), len(table),
+                         source_version.encode('ascii')[:16].ljust(16, b'0'))
+    return b''.join([header, table, sources.tobytes(), targets.tobytes(), weights.tobytes()])
+
+class NetworkBinary:
+    """Read-only view of a binary network; the edge arrays are numpy views into the buffer (no copies)"""
+
+    def __init__(self, buffer, file_id: Optional[Tuple] = None):
+        magic, version, n_nodes, n_edges, table_length, source_version = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a version {FORMAT_VERSION} binary network")
+        self.buffer = buffer
+        self.file_id = file_id
+        self.n_nodes = n_nodes
+        self.n_edges = n_edges
+        self.source_version = source_version.decode('ascii')
+        self._table_slice = slice(HEADER.size, HEADER.size + table_length)
+        offset = HEADER.size + table_length
+        self.sources = np.frombuffer(buffer, dtype=EDGE_DTYPE, count=n_edges, offset=offset)
+        self.targets = np.frombuffer(buffer, dtype=EDGE_DTYPE, count=n_edges, offset=offset + 4 * n_edges)
+        self.weights = np.frombuffer(buffer, dtype=EDGE_DTYPE, count=n_edges, offset=offset + 8 * n_edges)
+
+    @classmethod
+    def open(cls, path: str) -> 'NetworkBinary':
+        """Memory-map a binary network file"""
+        with open(path, 'rb') as f:
+            return cls(np.memmap(f, dtype=np.uint8, mode='r'), file_identity(os.fstat(f.fileno())))
+
+    def open_file(self, path: str) -> Optional[BinaryIO]:
+        """Open `path` for sending if it is still the file this view maps, else None.
+
+        Builds replace the file with a rename, so a matching identity means the
+        bytes on disk are the ones that were checked when it was mapped.
+        """
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+        if self.file_id is None or file_identity(os.fstat(f.fileno())) != self.file_id:
+            f.close()
+            return None
+        return f
+
+    def node_table(self) -> Dict[str, Any]:
+        return json.loads(bytes(self.buffer[self._table_slice]))
+
+    def to_network(self) -> Dict[str, Any]:
+        """Decode back to the network_data.json structure"""
+        network = self.node_table()
+        ids = [node['id'] for node in network['nodes']]
+        network['links'] = [{'source': ids[s], 'target': ids[t], 'value': w}
+                            for s, t, w in zip(self.sources.tolist(), self.targets.tolist(), self.weights.tolist())]
+        return network
+
+def write_network_files(output_dir: str, network: Dict[str, Any]) -> str:
+    """Write network_data.json and its binary twin, stamped with the JSON's data version; returns that version"""
+    text = json.dumps(network, indent=2)
+    json_path = os.path.join(output_dir, JSON_FILENAME)
+    write_atomic(json_path, text)
+    version = data_version(text.encode('utf-8'))
+    binary = encode_network(network, version)
+    binary_path = os.path.join(output_dir, BINARY_FILENAME)
+    write_atomic(binary_path, binary)
+    logger.info(f"Saved network data to {json_path} and {binary_path} ({len(text.encode('utf-8'))} -> {len(binary)} bytes)")
+    return version
+
+def open_if_current(path: str, version: str) -> Optional[NetworkBinary]:
+    """Memory-map the binary file if it exists and was built from the given JSON data version"""
+    if not os.path.exists(path):
+        return None
+    try:
+        binary = NetworkBinary.open(path)
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning(f"Ignoring unreadable {path}: {str(e)}")
+        return None
+    if binary.source_version != version:
+        logger.info(f"{path} was built from data version {binary.source_version}, current is {version}")
+        return None
+    return binary
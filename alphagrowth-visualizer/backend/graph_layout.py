@@ -0,0 +1,176 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from graph_analytics import SEED, network_csr, row_argmax
+
+logger = logging.getLogger(__name__)
+
+# Positions are scaled into the NetworkGraph.tsx viewport
+LAYOUT_WIDTH = 800
+LAYOUT_HEIGHT = 600
+LAYOUT_MARGIN = 20
+COARSEST_SIZE = 100
+COARSEST_ITERATIONS = 300
+REFINE_ITERATIONS = 60
+EXACT_REPULSION_MAX = 1000  # above this, repulsion comes from a particle mesh instead of every other node
+GRID_CELLS = 128
+GRAVITY = 0.5
+
+Level = Tuple[sparse.csr_matrix, np.ndarray]  # (adjacency, mass)
+
+def coarsen(adjacency: sparse.csr_matrix) -> np.ndarray:
+    """Cluster of every node for the next coarser level.
+
+    Nodes whose heaviest neighbours are each other are merged (heavy-edge
+    matching), then each remaining node with edges joins the cluster of its
+    heaviest neighbour if that neighbour was matched. Isolated nodes are
+    paired up, so they coarsen away too.
+    """
+    n = adjacency.shape[0]
+    nodes = np.arange(n)
+    has_neighbours = np.diff(adjacency.indptr) > 0
+    best = np.where(has_neighbours, row_argmax(adjacency), nodes)
+    matched = has_neighbours & (best[best] == nodes)
+    leader = np.where(matched, np.minimum(nodes, best), nodes)
+    joins = has_neighbours & ~matched & matched[best]
+    leader[joins] = leader[best[joins]]
+    isolated = np.flatnonzero(~has_neighbours)
+    leader[isolated[1::2]] = isolated[0:len(isolated) - 1:2]
+    return np.unique(leader, return_inverse=True)[1]
+
+def coarse_level(adjacency: sparse.csr_matrix, mass: np.ndarray, clusters: np.ndarray) -> Level:
+    """Collapse each cluster into one node; edge weights and masses add up"""
+    n, m = len(clusters), int(clusters.max()) + 1
+    assignment = sparse.csr_matrix((np.ones(n), (np.arange(n), clusters)), shape=(n, m))
+    coarse = (assignment.T @ adjacency @ assignment).tolil()
+    coarse.setdiag(0)
+    coarse = coarse.tocsr()
+    coarse.eliminate_zeros()
+    return coarse, np.bincount(clusters, weights=mass, minlength=m)
+
+def _mesh_repulsion(positions: np.ndarray, mass: np.ndarray, edges: sparse.coo_matrix) -> np.ndarray:
+    """Particle-mesh repulsion: deposit mass on a grid, convolve with the 1/r kernel by FFT, interpolate back.
+
+    The mesh blurs everything closer than a cell. Neighbours are the pairs
+    that end up that close, so their missing short-range repulsion is added
+    back exactly.
+    """
+    low = positions.min(axis=0)
+    cell = max(float((positions.max(axis=0) - low).max()), 1e-9) / (GRID_CELLS - 1)
+    grid = (positions - low) / cell
+    nearest = np.rint(grid).astype(np.int64)
+    density = np.bincount(nearest[:, 0] * GRID_CELLS + nearest[:, 1], weights=mass,
+                          minlength=GRID_CELLS ** 2).reshape(GRID_CELLS, GRID_CELLS)
+
+    # Kernel (dx, dy) / (r^2 + softening) over every grid offset, zero-padded for a linear convolution
+    offsets = np.fft.fftfreq(2 * GRID_CELLS, 1 / (2 * GRID_CELLS)) * cell
+    dx, dy = np.meshgrid(offsets, offsets, indexing='ij')
+    inverse = 1 / (dx * dx + dy * dy + cell * cell)
+    shape = (2 * GRID_CELLS, 2 * GRID_CELLS)
+    density_hat = np.fft.rfft2(density, shape)
+    field = [np.fft.irfft2(density_hat * np.fft.rfft2(component * inverse), shape)[:GRID_CELLS, :GRID_CELLS]
+             for component in (dx, dy)]
+
+    # Bilinear interpolation of the field at each node
+    base = np.minimum(np.floor(grid).astype(np.int64), GRID_CELLS - 2)
+    fx, fy = (grid - base).T
+    i, j = base.T
+    force = np.empty_like(positions)
+    for axis, component in enumerate(field):
+        force[:, axis] = (component[i, j] * (1 - fx) * (1 - fy) + component[i + 1, j] * fx * (1 - fy) +
+                          component[i, j + 1] * (1 - fx) * fy + component[i + 1, j + 1] * fx * fy)
+
+    diff = positions[edges.row] - positions[edges.col]
+    distance2 = (diff ** 2).sum(axis=1)
+    missing = mass[edges.col] * (1 / (distance2 + 1e-4) - 1 / (distance2 + cell * cell))
+    for axis in range(2):
+        force[:, axis] += np.bincount(edges.row, weights=diff[:, axis] * missing, minlength=len(positions))
+    return force
+
+def _repulsion(positions: np.ndarray, mass: np.ndarray, edges: sparse.coo_matrix) -> np.ndarray:
+    """Fruchterman-Reingold repulsion (k = 1), exact for small graphs and from a mesh for large ones"""
+    n = len(positions)
+    if n > EXACT_REPULSION_MAX:
+        return _mesh_repulsion(positions, mass, edges)
+    force = np.empty_like(positions)
+    chunk = max(1, 4_000_000 // n)
+    for start in range(0, n, chunk):
+        block = positions[start:start + chunk]
+        dx = block[:, 0, None] - positions[None, :, 0]
+        dy = block[:, 1, None] - positions[None, :, 1]
+        strength = mass / (dx * dx + dy * dy + 1e-4)
+        # sum_j s_ij (p_i - p_j) = p_i * sum_j s_ij - s @ p
+        force[start:start + chunk] = block * strength.sum(axis=1)[:, None] - strength @ positions
+    return force
+
+def force_directed(adjacency: sparse.csr_matrix, mass: np.ndarray, positions: np.ndarray,
+                   iterations: int, temperature: float) -> np.ndarray:
+    """Vectorized Fruchterman-Reingold with ideal edge length 1, linear cooling and a weak pull to the centre"""
+    edges = adjacency.tocoo()
+    weights = edges.data / edges.data.mean() if edges.nnz else edges.data
+    positions = positions.copy()
+    for step in range(iterations):
+        displacement = _repulsion(positions, mass, edges)
+        diff = positions[edges.row] - positions[edges.col]
+        distance = np.sqrt((diff ** 2).sum(axis=1))
+        attraction = diff * (weights * distance)[:, None]
+        displacement[:, 0] -= np.bincount(edges.row, weights=attraction[:, 0], minlength=len(positions))
+        displacement[:, 1] -= np.bincount(edges.row, weights=attraction[:, 1], minlength=len(positions))
+        displacement -= GRAVITY * mass[:, None] * (positions - positions.mean(axis=0))
+
+        length = np.sqrt((displacement ** 2).sum(axis=1))
+        limit = temperature * (1 - step / iterations)
+        positions += displacement * (np.minimum(length, limit) / np.maximum(length, 1e-12))[:, None]
+    return positions
+
+def layout_positions(adjacency: sparse.csr_matrix, seed: int = SEED) -> np.ndarray:
+    """Multilevel force-directed layout: coarsen, lay out the coarsest graph, then refine level by level"""
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros((0, 2))
+    rng = np.random.default_rng(seed)
+    levels: List[Level] = [(adjacency, np.ones(n))]
+    clusterings: List[np.ndarray] = []
+    while levels[-1][0].shape[0] > COARSEST_SIZE:
+        clusters = coarsen(levels[-1][0])
+        # Stop when a round barely shrinks the graph (mostly isolated nodes left)
+        if clusters.max() + 1 > 0.9 * len(clusters):
+            break
+        clusterings.append(clusters)
+        levels.append(coarse_level(*levels[-1], clusters))
+
+    coarsest, mass = levels[-1]
+    spread = np.sqrt(mass.sum())
+    positions = rng.uniform(-spread, spread, size=(coarsest.shape[0], 2))
+    positions = force_directed(coarsest, mass, positions, COARSEST_ITERATIONS, spread)
+    for (level_adjacency, level_mass), clusters in zip(reversed(levels[:-1]), reversed(clusterings)):
+        # Children start at their cluster's position, jittered so they can separate
+        positions = positions[clusters] + rng.normal(scale=0.1, size=(len(clusters), 2))
+        positions = force_directed(level_adjacency, level_mass, positions, REFINE_ITERATIONS, 1.0)
+    return positions
+
+def fit_to_viewport(positions: np.ndarray) -> np.ndarray:
+    """Scale and centre positions into the LAYOUT_WIDTH x LAYOUT_HEIGHT viewport, keeping the aspect ratio"""
+    if not len(positions):
+        return positions
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    box = np.array([LAYOUT_WIDTH, LAYOUT_HEIGHT], dtype=np.float64) - 2 * LAYOUT_MARGIN
+    scale = (box / np.maximum(high - low, 1e-9)).min()
+    return (positions - (low + high) / 2) * scale + np.array([LAYOUT_WIDTH, LAYOUT_HEIGHT]) / 2
+
+def apply_layout(network: Dict[str, Any]) -> Dict[str, Any]:
+    """Store precomputed x / y viewport coordinates on every node of a network"""
+    if not network['nodes']:
+        return network
+    start = datetime.now()
+    _, adjacency = network_csr(network)
+    positions = fit_to_viewport(layout_positions(adjacency))
+    for node, (x, y) in zip(network['nodes'], np.round(positions, 1).tolist()):
+        node['x'] = x
+        node['y'] = y
+    logger.info(f"Laid out {len(network['nodes'])} nodes in {(datetime.now() - start).total_seconds():.1f}s")
+    return network
@@ -0,0 +1,89 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from participant_index import alphagrowth_slug, twitter_handle
+
+logger = logging.getLogger(__name__)
+
+AMBIGUOUS = -1
+
+def _present(value: Any) -> Optional[str]:
+    # CSV rows carry '' and DataFrames NaN where the database has NULL
+    return value if isinstance(value, str) and value else None
+
+class IdentityResolver:
+    """Maps appearance rows to dense integer participant ids (0, 1, ... in first-appearance order).
+
+    A participant is identified by their AlphaGrowth profile slug, else their
+    twitter handle, and a row carrying both ties the two together. Display
+    names are only aliases, so a rename keeps the id and two people sharing a
+    name keep theirs apart. A row with neither link resolves through its name
+    when exactly one participant has used it, else by the name itself.
+    """
+
+    def __init__(self):
+        self.keys: Dict[str, int] = {}  # 'ag:<slug>' / 'tw:<handle>' / 'name:<name>' -> id
+        self.aliases: Dict[str, int] = {}  # display name -> id, or AMBIGUOUS if several participants used it
+        self.count = 0
+        self._resolved: Dict[Tuple[str, Optional[str], Optional[str]], int] = {}
+
+    def resolve(self, name: str, alphagrowth_link: Optional[str] = None, twitter_link: Optional[str] = None) -> int:
+        alphagrowth_link, twitter_link = _present(alphagrowth_link), _present(twitter_link)
+        row_key = (name, alphagrowth_link, twitter_link)
+        participant_id = self._resolved.get(row_key)
+        if participant_id is not None:
+            return participant_id
+
+        keys = []
+        slug = alphagrowth_slug(alphagrowth_link)
+        if slug:
+            keys.append(f"ag:{slug}")
+        handle = twitter_handle(twitter_link)
+        if handle:
+            keys.append(f"tw:{handle}")
+        if not keys:
+            alias = self.aliases.get(name)
+            if alias is not None and alias != AMBIGUOUS:
+                participant_id = alias
+            keys.append(f"name:{name}")
+
+        if participant_id is None:
+            participant_id = next((self.keys[key] for key in keys if key in self.keys), None)
+        if participant_id is None:
+            participant_id = self.count
+            self.count += 1
+        else:
+            conflicts = {self.keys[key] for key in keys if self.keys.get(key, participant_id) != participant_id}
+            if conflicts:
+                # Already separate participants; keep them apart rather than renumbering
+                logger.warning(f"Row for {name!r} links participants {sorted(conflicts | {participant_id})}; "
+                               f"using {participant_id}")
+        for key in keys:
+            self.keys.setdefault(key, participant_id)
+
+        previous = self.aliases.get(name)
+        if previous is None:
+            self.aliases[name] = participant_id
+        elif previous != participant_id:
+            self.aliases[name] = AMBIGUOUS
+        self._resolved[row_key] = participant_id
+        return participant_id
+
+    def names_by_id(self) -> List[List[str]]:
+        """Every display name used by each participant (ambiguous names excluded)"""
+        names: List[List[str]] = [[] for _ in range(self.count)]
+        for name, participant_id in self.aliases.items():
+            if participant_id != AMBIGUOUS:
+                names[participant_id].append(name)
+        return names
+
+    def to_json(self) -> Dict[str, Any]:
+        return {'count': self.count, 'keys': self.keys, 'aliases': self.aliases}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'IdentityResolver':
+        resolver = cls()
+        resolver.count = data['count']
+        resolver.keys = data['keys']
+        resolver.aliases = data['aliases']
+        return resolver
@@ -0,0 +1,112 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from graph_analytics import network_csr
+
+logger = logging.getLogger(__name__)
+
+MAX_EGO_DEPTH = 3
+
+class NetworkIndex:
+    """CSR adjacency and edge arrays over network_data.json, built once per data version.
+
+    Nodes are ranked by weighted degree (ties keep the file order), so
+    `max_nodes` keeps the best-connected participants. A subgraph query is a
+    few vectorized masks over these arrays, plus building the JSON for the
+    nodes and links it returns.
+    """
+
+    def __init__(self, network: Dict[str, Any]):
+        self.nodes: List[Dict[str, Any]] = network['nodes']
+        self.extra = {key: value for key, value in network.items() if key not in ('nodes', 'links')}
+        self.ids, self.adjacency = network_csr(network)
+        self.positions: Dict[str, int] = {}
+        for i, node_id in enumerate(self.ids):
+            self.positions.setdefault(str(node_id), i)
+
+        upper = sparse.triu(self.adjacency, k=1).tocoo()
+        order = np.lexsort((upper.col, upper.row))
+        self.sources = upper.row[order].astype(np.int64)
+        self.targets = upper.col[order].astype(np.int64)
+        self.weights = np.rint(upper.data[order]).astype(np.int64)
+
+        n = len(self.ids)
+        weighted_degree = np.asarray(self.adjacency.sum(axis=1)).ravel()
+        self.rank = np.empty(n, dtype=np.int64)
+        self.rank[np.lexsort((np.arange(n), -weighted_degree))] = np.arange(n)
+
+    def position(self, node_id: str) -> Optional[int]:
+        return self.positions.get(str(node_id))
+
+    def community_labels(self, metrics: Dict[str, Any]) -> np.ndarray:
+        """Community of every node from graph_metrics.json (-1 where a node has no metrics)"""
+        node_metrics = metrics.get('nodes', {})
+        return np.fromiter((node_metrics.get(str(node_id), {}).get('community', -1) for node_id in self.ids),
+                           dtype=np.int64, count=len(self.ids))
+
+    def ego_distances(self, center: int, depth: int, min_edge_weight: int = 1) -> np.ndarray:
+        """Hop distance from `center` over edges of at least `min_edge_weight`, up to `depth` (-1 beyond)"""
+        distance = np.full(len(self.ids), -1, dtype=np.int64)
+        distance[center] = 0
+        frontier = np.array([center])
+        for hop in range(1, depth + 1):
+            rows = self.adjacency[frontier]
+            neighbours = np.unique(rows.indices[rows.data >= min_edge_weight])
+            frontier = neighbours[distance[neighbours] < 0]
+            if not len(frontier):
+                break
+            distance[frontier] = hop
+        return distance
+
+    def subgraph(self, max_nodes: Optional[int] = None, min_edge_weight: int = 1,
+                 communities: Optional[np.ndarray] = None, community: Optional[int] = None,
+                 ego: Optional[str] = None, depth: int = 1) -> Dict[str, Any]:
+        """The part of the network matching the filters, in the network_data.json shape.
+
+        `ego` limits nodes to those within `depth` hops of that node id and
+        `community` to one community (`communities` holds every node's label).
+        `max_nodes` then keeps the nodes closest to the ego node, breaking ties
+        (or, without an ego, ranking everything) by weighted degree. Links are
+        those between kept nodes with weight >= `min_edge_weight`. Raises
+        KeyError for an unknown ego id.
+        """
+        keep = np.ones(len(self.ids), dtype=bool)
+        priority = self.rank
+        if ego is not None:
+            center = self.position(ego)
+            if center is None:
+                raise KeyError(ego)
+            distance = self.ego_distances(center, depth, min_edge_weight)
+            keep &= distance >= 0
+            priority = distance * len(self.ids) + self.rank
+        if community is not None:
+            keep &= communities == community
+            if ego is not None:
+                keep[center] = True
+
+        selected = np.flatnonzero(keep)
+        truncated = max_nodes is not None and len(selected) > max_nodes
+        if truncated:
+            selected = np.sort(selected[np.argsort(priority[selected], kind='stable')[:max_nodes]])
+            keep = np.zeros(len(self.ids), dtype=bool)
+            keep[selected] = True
+
+        edges = keep[self.sources] & keep[self.targets] & (self.weights >= min_edge_weight)
+        links = [{'source': self.ids[s], 'target': self.ids[t], 'value': w}
+                 for s, t, w in zip(self.sources[edges].tolist(), self.targets[edges].tolist(),
+                                    self.weights[edges].tolist())]
+        return {
+            **self.extra,
+            'nodes': [self.nodes[i] for i in selected.tolist()],
+            'links': links,
+            'subgraph': {
+                'nodes': len(selected),
+                'links': len(links),
+                'total_nodes': len(self.ids),
+                'total_links': len(self.weights),
+                'truncated': bool(truncated),
+            },
+        }
@@ -0,0 +1,128 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+def twitter_handle(twitter_url: Optional[str]) -> Optional[str]:
+    """Extract the lower-cased handle from a twitter.com / x.com profile URL"""
+    if not twitter_url:
+        return None
+    path = urlparse(str(twitter_url)).path.strip('/')
+    handle = path.split('/')[0] if path else ''
+    return handle.lower() or None
+
+def alphagrowth_slug(alphagrowth_link: Optional[str]) -> Optional[str]:
+    """Extract the lower-cased profile slug from an alphagrowth.io/spaces/participant/<slug> URL"""
+    if not alphagrowth_link:
+        return None
+    path = urlparse(str(alphagrowth_link)).path.rstrip('/')
+    slug = path.rsplit('/', 1)[-1] if path else ''
+    return slug.lower() or None
+
+def clean_participants(participants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalize participant records into the shape the frontend expects"""
+    cleaned_participants = []
+    for participant in participants:
+        try:
+            # Ensure all required fields are present and valid
+            cleaned = {
+                'id': str(participant.get('id', '')),
+                'name': str(participant.get('name', '')),
+                'role': str(participant.get('role', 'speaker')),
+                'spaces': int(participant.get('spaces', 0)),
+                'speaker_spaces': int(participant.get('speaker_spaces', 0)),
+                'twitter': str(participant.get('twitter', '')) if participant.get('twitter') else None
+            }
+            
+            # Calculate host_spaces
+            cleaned['host_spaces'] = cleaned['spaces'] - cleaned['speaker_spaces']
+            
+            # Validate role
+            if cleaned['role'] not in ['host', 'speaker', 'both']:
+                cleaned['role'] = 'both' if cleaned['host_spaces'] > 0 and cleaned['speaker_spaces'] > 0 else \
+                                'host' if cleaned['host_spaces'] > 0 else 'speaker'
+            
+            cleaned_participants.append(cleaned)
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error cleaning participant data: {str(e)}")
+            continue
+    return cleaned_participants
+
+def id_key(participant_id: Any) -> Union[int, str]:
+    """Integer key for the numeric ids of the identity-resolved build, the id string otherwise"""
+    participant_id = str(participant_id)
+    return int(participant_id) if participant_id.isdigit() else participant_id
+
+class ParticipantIndex:
+    """Dictionary indexes over participants_data.json, built once per data version"""
+
+    def __init__(self, participants: List[Dict[str, Any]]):
+        self.by_id: Dict[Union[int, str], Dict[str, Any]] = {}
+        self.by_name: Dict[str, Dict[str, Any]] = {}
+        self.by_twitter: Dict[str, Dict[str, Any]] = {}
+        self.by_slug: Dict[str, Dict[str, Any]] = {}
+        for participant in participants:
+            # First occurrence wins, matching the linear scan this replaces
+            if participant.get('id') is not None:
+                self.by_id.setdefault(id_key(participant['id']), participant)
+            if participant.get('name'):
+                self.by_name.setdefault(str(participant['name']).lower(), participant)
+            handle = twitter_handle(participant.get('twitter'))
+            if handle:
+                self.by_twitter.setdefault(handle, participant)
+            slug = alphagrowth_slug(participant.get('alphagrowth_link'))
+            if slug:
+                self.by_slug.setdefault(slug, participant)
+        # Earlier display names, after every current one so they never shadow it
+        for participant in participants:
+            for alias in participant.get('aliases') or []:
+                self.by_name.setdefault(str(alias).lower(), participant)
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Find a participant by id, then twitter handle (with or without @), AlphaGrowth slug, then name or alias"""
+        participant = self.by_id.get(id_key(key))
+        if participant is None:
+            participant = self.by_twitter.get(key.lstrip('@').lower())
+        if participant is None:
+            participant = self.by_slug.get(key.lower())
+        if participant is None:
+            participant = self.by_name.get(key.lower())
+        return participant
+
+SORT_KEYS = ['spaces', 'host_spaces', 'speaker_spaces']
+ROLE_FILTERS = {
+    # host / speaker include participants who did both, like the TopParticipants tabs
+    'host': ('host', 'both'),
+    'speaker': ('speaker', 'both'),
+    'both': ('both',),
+}
+LISTING_FIELDS = ['id', 'name', 'role', 'spaces', 'host_spaces', 'speaker_spaces', 'twitter']
+
+class ParticipantListing:
+    """Presorted, prefiltered views of the cleaned participant list.
+
+    Every (role, sort) combination is materialized as a list of positions
+    into `participants` when the data version is loaded, so a page request
+    is just a slice plus a projection.
+    """
+
+    def __init__(self, participants: List[Dict[str, Any]]):
+        self.participants = participants
+        self.orders: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+        for role in [None, *ROLE_FILTERS]:
+            positions = [i for i, p in enumerate(participants) if role is None or p['role'] in ROLE_FILTERS[role]]
+            self.orders[(role, None)] = positions
+            for key in SORT_KEYS:
+                # Descending and stable, so ties keep the file order
+                self.orders[(role, key)] = sorted(positions, key=lambda i: -participants[i][key])
+
+    def page(self, role: Optional[str] = None, sort: Optional[str] = None, offset: int = 0,
+             limit: Optional[int] = None, fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page of participants and the total number matching the filter"""
+        positions = self.orders[(role, sort)]
+        end = len(positions) if limit is None else offset + limit
+        rows = [self.participants[i] for i in positions[offset:end]]
+        if fields:
+            rows = [{field: row[field] for field in fields} for row in rows]
+        return rows, len(positions)
@@ -0,0 +1,52 @@
+import gzip
+import json
+from typing import Any, Dict
+
+from flask import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; clients fall back to gzip
+    brotli = None
+
+# The URLs are not versioned, so browsers revalidate after max-age and get a 304 while the data is unchanged
+CACHE_CONTROL = 'public, max-age=3600, stale-while-revalidate=86400'
+
+def serialize(data: Any) -> bytes:
+    """Serialize like jsonify does outside debug mode: compact, sorted keys, trailing newline"""
+    return (json.dumps(data, separators=(',', ':'), sort_keys=True) + '\n').encode('utf-8')
+
+class EncodedPayload:
+    """A JSON response body serialized once, with ready-to-send compressed variants"""
+
+    def __init__(self, data: Any, version: str):
+        body = serialize(data)
+        self.version = version
+        self.bodies: Dict[str, bytes] = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(body)
+
+    def etag(self, encoding: str) -> str:
+        # Each encoding is a different byte sequence, so it gets its own strong ETag
+        return self.version if encoding == 'identity' else f"{self.version}-{encoding}"
+
+    def choose_encoding(self, request: Request) -> str:
+        for encoding in ('br', 'gzip'):
+            if encoding in self.bodies and request.accept_encodings[encoding] > 0:
+                return encoding
+        return 'identity'
+
+    def response(self, request: Request) -> Response:
+        """Build the response for `request`, or a 304 if the client already has this version"""
+        encoding = self.choose_encoding(request)
+        etag = self.etag(encoding)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.bodies[encoding], mimetype='application/json')
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
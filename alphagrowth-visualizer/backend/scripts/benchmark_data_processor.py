@@ -0,0 +1,92 @@
+"""Benchmark data_processor.build_participant_nodes against the old iterrows loop.
+
+Usage: python scripts/benchmark_data_processor.py [--rows 900 10000 100000 1000000] [--legacy-max-rows 100000]
+
+Synthetic appearance rows follow the shape of the scraped CSVs (a few hosts
+and several speakers per space, a long tail of one-off participants, some
+missing twitter links). For every size where the legacy loop runs, the two
+implementations are also checked for identical output.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_processor import ParticipantNode, build_participant_nodes
+
+def legacy_participant_nodes(df: pd.DataFrame) -> Dict[str, ParticipantNode]:
+    """The row-by-row implementation build_participant_nodes replaced, kept as the baseline"""
+    participants: Dict[str, ParticipantNode] = {}
+    for _, row in df.iterrows():
+        if pd.isna(row['name']) or pd.isna(row['role']) or pd.isna(row['space_url']):
+            continue
+        name = str(row['name'])
+        role = str(row['role']).rstrip('s').lower()
+        if name not in participants:
+            participants[name] = ParticipantNode(name)
+            participants[name].twitter = str(row['twitter_link']) if not pd.isna(row['twitter_link']) else None
+            participants[name].alphagrowth_link = str(row['alphagrowth_link']) if not pd.isna(row['alphagrowth_link']) else None
+        participants[name].add_space(str(row['space_url']), role)
+    return participants
+
+def synthetic_appearances(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n_participants = max(10, n_rows // 3)
+    n_spaces = max(1, n_rows // 6)
+    # Zipf-like activity: a few participants appear in many spaces
+    participant_ids = np.minimum(rng.zipf(1.3, n_rows) - 1, n_participants - 1)
+    space_ids = np.sort(rng.integers(0, n_spaces, n_rows))
+    roles = np.where(rng.random(n_rows) < 0.2, 'hosts', 'speakers')
+    twitter = np.array([f"https://twitter.com/user{i}" for i in range(n_participants)], dtype=object)
+    twitter[rng.random(n_participants) < 0.1] = None
+    return pd.DataFrame({
+        'space_url': [f"https://alphagrowth.io/spaces/space-{i}" for i in space_ids],
+        'role': roles,
+        'name': [f"Participant {i}" for i in participant_ids],
+        'alphagrowth_link': [f"https://alphagrowth.io/spaces/participant/user{i}" for i in participant_ids],
+        'twitter_link': twitter[participant_ids],
+    })
+
+def best_time(func, df: pd.DataFrame, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark participant aggregation')
+    parser.add_argument('--rows', type=int, nargs='+', default=[900, 10_000, 100_000, 1_000_000, 3_000_000])
+    parser.add_argument('--legacy-max-rows', type=int, default=100_000,
+                        help='Skip the iterrows baseline above this many rows (it is very slow)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size; the best time is reported')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'participants':>13} {'iterrows (s)':>13} {'vectorized (s)':>15} {'speedup':>8}  output")
+    for n_rows in args.rows:
+        df = synthetic_appearances(n_rows)
+        repeat = args.repeat if n_rows <= 100_000 else 1
+        vectorized_time, nodes = best_time(build_participant_nodes, df, repeat)
+
+        legacy_cell, speedup_cell, check = '-', '-', 'not checked'
+        if n_rows <= args.legacy_max_rows:
+            legacy_time, legacy_nodes = best_time(legacy_participant_nodes, df, repeat)
+            legacy_cell = f"{legacy_time:.3f}"
+            speedup_cell = f"{legacy_time / vectorized_time:.1f}x"
+            # Synthetic names and profiles are one-to-one, so identity resolution groups exactly like
+            # the name-keyed baseline; only the node ids differ
+            same = len(nodes) == len(legacy_nodes) and all(
+                {**node.to_dict(), 'id': None} == {**legacy.to_dict(), 'id': None, 'aliases': []}
+                for node, legacy in zip(nodes.values(), legacy_nodes.values()))
+            check = 'identical' if same else 'MISMATCH'
+
+        print(f"{n_rows:>10} {len(nodes):>13} {legacy_cell:>13} {vectorized_time:>15.3f} {speedup_cell:>8}  {check}")
+
+if __name__ == '__main__':
+    main()
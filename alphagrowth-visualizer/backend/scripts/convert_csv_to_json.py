@@ -1,20 +1,91 @@
-import pandas as pd
+import argparse
+import csv
 import json
 import os
+import sys
 import logging
-from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import find_database, iter_appearances, appearance_watermark, count_spaces
+from aggregation import AggregateState, STATE_FILENAME, file_signature, write_atomic
+from graph_format import write_network_files
+from graph_analytics import materialize_graph_metrics
+from graph_layout import apply_layout
+from data_cache import data_version
+from stats import find_last_run_date, materialize_stats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def convert_csv_to_json():
+def snapshot_files(source_data_dir, prefix):
+    """[filename, size, mtime] for every <prefix>*.csv snapshot, oldest first"""
+    files = sorted(f for f in os.listdir(source_data_dir) if f.startswith(prefix) and f.endswith('.csv'))
+    return [[f, *file_signature(os.path.join(source_data_dir, f))] for f in files]
+
+def iter_csv_rows(source_data_dir, filenames):
+    for filename in filenames:
+        logger.info(f"Processing {filename}...")
+        with open(os.path.join(source_data_dir, filename), 'r', encoding='utf-8', newline='') as f:
+            yield from csv.DictReader(f)
+
+def plan_participant_rows(state, source_data_dir):
+    """Work out which appearance rows have not been folded into `state` yet.
+
+    Returns (state, rows, source). When rows that were already folded in have
+    changed (a snapshot was rewritten, a space was rescraped into the
+    database, the source switched) `state` is replaced by an empty one and
+    `rows` covers everything.
+    """
+    previous = state.sources.get('participants') if state else None
+    db_path = find_database([source_data_dir])
+    if db_path:
+        logger.info(f"Reading participants from database: {db_path}")
+        max_rowid, rows = appearance_watermark(db_path)
+        source = {'kind': 'db', 'path': db_path, 'max_rowid': max_rowid, 'rows': rows}
+        if (previous and previous['kind'] == 'db' and previous['path'] == db_path
+                and max_rowid >= previous['max_rowid']
+                and appearance_watermark(db_path, previous['max_rowid'])[1] == previous['rows']):
+            return state, iter_appearances(db_path, previous['max_rowid'], max_rowid), source
+        return AggregateState(), iter_appearances(db_path, 0, max_rowid), source
+
+    files = snapshot_files(source_data_dir, 'participants_')
+    logger.info(f"Found participants files: {[f[0] for f in files]}")
+    source = {'kind': 'csv', 'files': files}
+    # Snapshots are folded in filename (date) order, so only files sorting after the folded ones can be appended
+    if previous and previous['kind'] == 'csv' and files[:len(previous['files'])] == previous['files']:
+        return state, iter_csv_rows(source_data_dir, [f[0] for f in files[len(previous['files']):]]), source
+    return AggregateState(), iter_csv_rows(source_data_dir, [f[0] for f in files]), source
+
+def update_listed_spaces(state, source_data_dir):
+    """Fold new space_urls*.csv listings into the set of known space URLs"""
+    files = {f[0]: f[1:] for f in snapshot_files(source_data_dir, 'space_urls')}
+    previous = state.sources.get('listings', {})
+    if any(files.get(name) != signature for name, signature in previous.items()):
+        state.listed_spaces = set()
+        previous = {}
+    for filename in files:
+        if filename not in previous:
+            with open(os.path.join(source_data_dir, filename), 'r', encoding='utf-8', newline='') as f:
+                state.listed_spaces.update(row['url'] for row in csv.DictReader(f))
+    state.sources['listings'] = files
+
+def read_total_spaces(data_dir):
+    path = os.path.join(data_dir, 'total_spaces.txt')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return int(f.read().strip())
+
+def convert_csv_to_json(full_rebuild=False, source_data_dir=None, dest_data_dir=None):
     try:
         # Get the source and destination directories
         script_dir = os.path.dirname(os.path.abspath(__file__))
         backend_dir = os.path.dirname(script_dir)
-        source_data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(script_dir))), 'data')  # Where the CSV files are
-        dest_data_dir = os.path.join(backend_dir, 'data')  # Where to save JSON files
+        if source_data_dir is None:
+            source_data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(script_dir))), 'data')  # Where the CSV files are
+        if dest_data_dir is None:
+            dest_data_dir = os.path.join(backend_dir, 'data')  # Where to save JSON files
         
         # Create destination directory if it doesn't exist
         os.makedirs(dest_data_dir, exist_ok=True)
@@ -23,110 +94,58 @@ def convert_csv_to_json():
         logger.info(f"Destination data directory: {dest_data_dir}")
         logger.info(f"Source directory contents: {os.listdir(source_data_dir)}")
 
-        # Find all participants CSV files
-        participants_files = [f for f in os.listdir(source_data_dir) if f.startswith('participants_') and f.endswith('.csv')]
-        participants_files.sort()  # Sort to process oldest first
-        
-        logger.info(f"Found participants files: {participants_files}")
-        
-        # Group by name to count spaces and determine roles
-        participant_stats = defaultdict(lambda: {
-            'spaces': 0,
-            'roles': set(),
-            'twitter': '',
-            'host_spaces': 0,
-            'speaker_spaces': 0,
-            'space_urls': set()  # Track unique spaces
-        })
-        
-        # Process each participants file
-        for participants_file in participants_files:
-            logger.info(f"Processing {participants_file}...")
-            participants_df = pd.read_csv(os.path.join(source_data_dir, participants_file))
-            
-            for _, row in participants_df.iterrows():
-                name = row['name']
-                role = row['role'].lower()  # Convert to lowercase
-                if role == 'speakers':  # Fix plural form
-                    role = 'speaker'
-                
-                # Only count unique spaces
-                if row['space_url'] not in participant_stats[name]['space_urls']:
-                    participant_stats[name]['spaces'] += 1
-                    participant_stats[name]['space_urls'].add(row['space_url'])
-                
-                participant_stats[name]['roles'].add(role)
-                
-                # Count spaces by role
-                if role == 'host':
-                    participant_stats[name]['host_spaces'] += 1
-                elif role == 'speaker':
-                    participant_stats[name]['speaker_spaces'] += 1
-                
-                if pd.notna(row['twitter_link']):
-                    participant_stats[name]['twitter'] = row['twitter_link']
-        
-        # Transform to final format
-        participants_data = []
-        name_to_id = {}
-        for idx, (name, stats) in enumerate(participant_stats.items(), start=1):
-            # Determine role
-            roles = stats['roles']
-            if len(roles) > 1:
-                role = 'both'
-            else:
-                role = list(roles)[0]
-            
-            participant = {
-                'id': str(idx),  # Generate sequential IDs
-                'name': name,
-                'role': role,
-                'spaces': stats['spaces'],
-                'host_spaces': stats['host_spaces'],
-                'speaker_spaces': stats['speaker_spaces'],
-                'twitter': stats['twitter']
-            }
-            participants_data.append(participant)
-            name_to_id[name] = str(idx)
+        # Resume from the aggregates of the previous build and fold in only rows it has not seen.
+        # One pass over those rows updates participant stats, space membership and edge weights together,
+        # so memory grows with unique participants/spaces rather than with raw rows
+        state_path = os.path.join(dest_data_dir, STATE_FILENAME)
+        state = None if full_rebuild else AggregateState.load(state_path)
+        state, rows, source = plan_participant_rows(state, source_data_dir)
+        if not state.sources:
+            logger.info("Building aggregates from scratch")
+        added = state.add_rows(rows)
+        state.sources['participants'] = source
+        logger.info(f"Folded in {added} new appearance rows ({state.appearance_rows} total)")
         
+        participants_data = state.participants_data()
         logger.info(f"Processed {len(participants_data)} unique participants")
         
         # Save participants data
-        with open(os.path.join(dest_data_dir, 'participants_data.json'), 'w') as f:
-            json.dump(participants_data, f, indent=2)
+        participants_text = json.dumps(participants_data, indent=2)
+        write_atomic(os.path.join(dest_data_dir, 'participants_data.json'), participants_text)
         logger.info("Saved participants data to JSON")
 
         # Build network data from all participants
         logger.info("Building network data...")
         network_data = {
-            'nodes': participants_data,
-            'links': []
+            # Copies, since the layout stage adds x / y to the nodes
+            'nodes': [dict(participant) for participant in participants_data],
+            'links': state.links(participants_data)
         }
         
-        # Create links between participants in the same space
-        space_participants = defaultdict(set)
-        for participants_file in participants_files:
-            participants_df = pd.read_csv(os.path.join(source_data_dir, participants_file))
-            for _, row in participants_df.iterrows():
-                space_participants[row['space_url']].add(row['name'])
-        
-        for space, participants in space_participants.items():
-            participants = list(participants)
-            for i in range(len(participants)):
-                for j in range(i + 1, len(participants)):
-                    link = {
-                        'source': name_to_id[participants[i]],
-                        'target': name_to_id[participants[j]],
-                        'value': 1
-                    }
-                    network_data['links'].append(link)
-        
         logger.info(f"Processed {len(network_data['nodes'])} nodes and {len(network_data['links'])} links")
+        apply_layout(network_data)
         
-        # Save network data
-        with open(os.path.join(dest_data_dir, 'network_data.json'), 'w') as f:
-            json.dump(network_data, f, indent=2)
-        logger.info("Saved network data to JSON")
+        # Save network data, plus the compact binary encoding served by /api/network?format=binary
+        network_version = write_network_files(dest_data_dir, network_data)
+        materialize_graph_metrics(dest_data_dir, network_data, network_version)
+
+        # Total spaces: every space URL known to the database, or listed in the space_urls snapshots
+        db_path = find_database([source_data_dir])
+        update_listed_spaces(state, source_data_dir)
+        total_spaces = count_spaces(db_path) if db_path else len(state.listed_spaces)
+        if total_spaces:
+            write_atomic(os.path.join(dest_data_dir, 'total_spaces.txt'), f"{total_spaces}\n")
+            logger.info(f"Saved total spaces: {total_spaces}")
+        else:
+            logger.warning("No space listings found; leaving total_spaces.txt unchanged")
+            total_spaces = read_total_spaces(dest_data_dir)
+
+        # Stamped with the participants data version so the API can tell which build they belong to
+        materialize_stats(dest_data_dir, participants_data, data_version(participants_text.encode('utf-8')),
+                          total_spaces or 0, state.appearance_rows, find_last_run_date(source_data_dir, db_path))
+
+        # Saved last, so an interrupted build is redone from the previous state
+        state.save(state_path)
         
         return True
     except Exception as e:
@@ -136,6 +155,10 @@ def convert_csv_to_json():
         return False
 
 if __name__ == '__main__':
-    success = convert_csv_to_json()
+    parser = argparse.ArgumentParser(description='Build the visualizer JSON files from the scraped participants')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the saved aggregate state and rebuild from every snapshot')
+    args = parser.parse_args()
+    success = convert_csv_to_json(full_rebuild=args.full)
     if not success:
         exit(1) 
\ No newline at end of file
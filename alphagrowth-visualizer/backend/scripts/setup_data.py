@@ -31,13 +31,15 @@ def setup_data_directory():
     
     # Required files
     required_files = ['participants_data.json', 'network_data.json', 'total_spaces.txt']
+    # Copied along when present
+    optional_files = ['alphagrowth.db', 'stats.json', 'network_data.bin', 'graph_metrics.json']
     
     # Find source files
     source_files = {}
     for source_dir in source_dirs:
         if os.path.exists(source_dir):
             logger.info(f"Checking source directory: {source_dir}")
-            for file in required_files:
+            for file in required_files + optional_files:
                 file_path = os.path.join(source_dir, file)
                 if os.path.exists(file_path):
                     source_files[file] = file_path
@@ -0,0 +1,168 @@
+import bisect
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from participant_index import alphagrowth_slug, twitter_handle
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MIN_FUZZY_SIMILARITY = 0.3
+
+# Prefix matches rank by the kind of term matched, then by number of spaces
+NAME, HANDLE, WORD = 3, 2, 1
+
+_NON_ALNUM = re.compile(r'[\W_]+')
+
+def normalize(text: Any) -> str:
+    """Lower-case, accent- and punctuation-free form used for both terms and queries"""
+    text = str(text)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', unicodedata.normalize('NFKC', text))
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(' ', text.casefold()).strip()
+
+def trigram_codes(terms: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct character trigrams of each term, padded with spaces so short terms still have some.
+
+    Returns (codes, owners): every trigram packed into an int64 (three 21-bit
+    code points) and the index of the term it came from, sorted by (code, owner).
+    """
+    padded = [f"  {term} " for term in terms]
+    lengths = np.array([len(term) for term in padded], dtype=np.int64)
+    chars = np.frombuffer(''.join(padded).encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    counts = lengths - 2
+    owners = np.repeat(np.arange(len(terms)), counts)
+    starts = np.repeat(np.cumsum(lengths) - lengths, counts)
+    first = starts + np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+    codes = (chars[first] << 42) | (chars[first + 1] << 21) | chars[first + 2]
+
+    order = np.lexsort((owners, codes))
+    codes, owners = codes[order], owners[order]
+    distinct = np.ones(len(codes), dtype=bool)
+    distinct[1:] = (codes[1:] != codes[:-1]) | (owners[1:] != owners[:-1])
+    return codes[distinct], owners[distinct]
+
+class SearchIndex:
+    """Prefix and trigram indexes over participant names and handles, built once per data version.
+
+    Every participant contributes terms (full name, each word of it, twitter
+    handle, AlphaGrowth slug and earlier names) to a sorted array, so a
+    prefix query is two bisections plus ranking the matching slice. Queries
+    with too few prefix matches fall back to trigram similarity against the
+    same terms, counted only over the posting lists of the query's trigrams.
+    """
+
+    def __init__(self, participants: List[Dict[str, Any]]):
+        self.participants = participants
+        popularity = np.array([int(p.get('spaces', p.get('total_spaces', 0)) or 0) for p in participants],
+                              dtype=np.int64)
+
+        terms: List[str] = []
+        positions: List[int] = []
+        kinds: List[int] = []
+        for position, participant in enumerate(participants):
+            best: Dict[str, int] = {}
+            for kind, term in self._terms(participant):
+                if term and best.get(term, 0) < kind:
+                    best[term] = kind
+            terms.extend(best)
+            kinds.extend(best.values())
+            positions.extend([position] * len(best))
+
+        # Sorted by term; the stable sort keeps positions ascending within a term
+        order = np.argsort(np.array(terms, dtype=str), kind='stable') if terms else np.zeros(0, dtype=np.int64)
+        self.terms = [terms[i] for i in order.tolist()]
+        self.positions = np.array(positions, dtype=np.int64)[order]
+        kinds = np.array(kinds, dtype=np.int64)[order]
+        self.scores = kinds * (int(popularity.max(initial=0)) + 1) + popularity[self.positions]
+
+        # Trigram postings over every term, as sorted arrays: the entries containing
+        # trigram gram_codes[i] are gram_entries[gram_bounds[i]:gram_bounds[i + 1]]
+        codes, self.gram_entries = trigram_codes(self.terms)
+        self.trigram_counts = np.bincount(self.gram_entries, minlength=len(self.terms))
+        self.gram_codes, starts = np.unique(codes, return_index=True)
+        self.gram_bounds = np.append(starts, len(codes))
+        logger.info(f"Built search index with {len(self.terms)} terms and {len(self.gram_codes)} trigrams")
+
+    @staticmethod
+    def _terms(participant: Dict[str, Any]):
+        name = normalize(participant.get('name', ''))
+        yield NAME, name
+        for word in name.split()[1:]:
+            yield WORD, word
+        handle = twitter_handle(participant.get('twitter'))
+        if handle:
+            yield HANDLE, normalize(handle).replace(' ', '')
+        slug = alphagrowth_slug(participant.get('alphagrowth_link'))
+        if slug:
+            yield HANDLE, normalize(slug).replace(' ', '')
+        for alias in participant.get('aliases') or []:
+            yield WORD, normalize(alias)
+
+    def _top_entries(self, lo: int, hi: int, count: int) -> List[int]:
+        """The `count` best-scoring entries in terms[lo:hi], best first"""
+        scores = self.scores[lo:hi]
+        if count < len(scores):
+            candidates = np.argpartition(-scores, count - 1)[:count]
+        else:
+            candidates = np.arange(len(scores))
+        return (lo + candidates[np.argsort(-scores[candidates], kind='stable')]).tolist()
+
+    def _prefix_matches(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        lo = bisect.bisect_left(self.terms, query)
+        hi = bisect.bisect_left(self.terms, query + '\U0010ffff', lo)
+        # Exact matches sort first in the prefix range
+        exact = bisect.bisect_right(self.terms, query, lo, hi)
+        # A participant can match through several terms, so take extra candidates before de-duplicating
+        return ([(int(self.positions[entry]), 1.0) for entry in self._top_entries(lo, exact, limit * 4)] +
+                [(int(self.positions[entry]), 0.9) for entry in self._top_entries(exact, hi, limit * 4)])
+
+    def _fuzzy_matches(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        grams, _ = trigram_codes([query])
+        found = np.minimum(np.searchsorted(self.gram_codes, grams), max(len(self.gram_codes) - 1, 0))
+        found = found[self.gram_codes[found] == grams] if len(self.gram_codes) else found[:0]
+        if not len(found):
+            return []
+        lists = [self.gram_entries[self.gram_bounds[i]:self.gram_bounds[i + 1]] for i in found.tolist()]
+        matched, shared = np.unique(np.concatenate(lists), return_counts=True)
+        similarity = shared / (len(grams) + self.trigram_counts[matched] - shared)
+        keep = similarity >= MIN_FUZZY_SIMILARITY
+        matched, similarity = matched[keep], similarity[keep]
+        order = np.lexsort((-self.scores[matched], -similarity))[:limit * 4]
+        return [(int(self.positions[matched[i]]), round(float(similarity[i]), 3)) for i in order.tolist()]
+
+    def _collect(self, results: List[Dict[str, Any]], seen: set, matches: List[Tuple[int, float]],
+                 match: str, limit: int):
+        for position, score in matches:
+            if len(results) >= limit:
+                return
+            if position in seen:
+                continue
+            seen.add(position)
+            participant = self.participants[position]
+            results.append({
+                'id': str(participant.get('id', '')),
+                'name': participant.get('name'),
+                'twitter': participant.get('twitter') or None,
+                'spaces': int(participant.get('spaces', participant.get('total_spaces', 0)) or 0),
+                'match': match,
+                'score': score,
+            })
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        """Ranked participants for a typeahead query: prefix matches, then fuzzy matches to fill up"""
+        query = normalize(query)
+        if not query:
+            return []
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        self._collect(results, seen, self._prefix_matches(query, limit), 'prefix', limit)
+        if len(results) < limit:
+            self._collect(results, seen, self._fuzzy_matches(query, limit), 'fuzzy', limit)
+        return results
@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from aggregation import write_atomic
+from database import last_scraped_at
+
+logger = logging.getLogger(__name__)
+
+STATS_FILENAME = 'stats.json'
+
+def find_last_run_date(data_dir: str, db_path: Optional[str] = None) -> Optional[str]:
+    """Date of the most recent data collection: the database's last scrape, else the newest participants CSV"""
+    if db_path:
+        scraped_at = last_scraped_at(db_path)
+        if scraped_at:
+            return datetime.fromisoformat(scraped_at).strftime('%B %d, %Y')
+
+    logger.info(f"Looking for participants files in: {data_dir}")
+    
+    # Look for both participants_*.csv and participants.csv
+    participants_files = [f for f in os.listdir(data_dir)
+                          if (f.startswith('participants_') and f.endswith('.csv')) or f == 'participants.csv']
+    logger.info(f"Found participants CSV files: {participants_files}")
+    
+    if not participants_files:
+        logger.warning("No participants CSV files found!")
+        return None
+        
+    # Get the latest file
+    latest_file = sorted(participants_files)[-1]
+    logger.info(f"Latest participants file: {latest_file}")
+    
+    # Extract date from filename (participants_YYYYMMDD.csv)
+    if latest_file.startswith('participants_'):
+        date_str = latest_file.split('_')[1].split('.')[0]
+        date = datetime.strptime(date_str, '%Y%m%d')
+    else:
+        # If it's just participants.csv, use its modification time
+        date = datetime.fromtimestamp(os.path.getmtime(os.path.join(data_dir, latest_file)))
+    return date.strftime('%B %d, %Y')
+
+def compute_stats(participants: List[Dict[str, Any]], total_spaces: int, total_appearances: int,
+                  last_run_date: Optional[str]) -> Dict[str, Any]:
+    """Summary statistics served by /api/stats, computed column-wise in one pass.
+
+    Applies the same normalization as clean_participants: records whose space
+    counts are not numbers are skipped, host_spaces is spaces - speaker_spaces
+    and an unknown role is derived from those counts.
+    """
+    # Missing keys default like clean_participants; explicit nulls and non-numbers invalidate the record
+    spaces = pd.to_numeric(pd.Series([p.get('spaces', 0) for p in participants], dtype=object), errors='coerce')
+    speaker_spaces = pd.to_numeric(pd.Series([p.get('speaker_spaces', 0) for p in participants], dtype=object),
+                                   errors='coerce')
+    valid = (spaces.notna() & speaker_spaces.notna()).to_numpy()
+    
+    names = np.array([str(p.get('name', '')) for p in participants], dtype=object)[valid]
+    role = np.array([str(p.get('role', 'speaker')) for p in participants], dtype=object)[valid]
+    spaces = spaces.to_numpy()[valid].astype(np.int64)
+    speaker_spaces = speaker_spaces.to_numpy()[valid].astype(np.int64)
+    host_spaces = spaces - speaker_spaces
+    derived_role = np.where((host_spaces > 0) & (speaker_spaces > 0), 'both',
+                            np.where(host_spaces > 0, 'host', 'speaker'))
+    role = np.where(np.isin(role, ['host', 'speaker', 'both']), role, derived_role)
+    
+    is_host = np.isin(role, ['host', 'both'])
+    is_speaker = np.isin(role, ['speaker', 'both'])
+    
+    def most_active(mask, counts):
+        # argmax returns the first maximum, like max() over the participant list
+        if not mask.any():
+            return {'name': 'N/A', 'spaces': 0}
+        candidates = np.flatnonzero(mask)
+        best = candidates[np.argmax(counts[candidates])]
+        return {'name': str(names[best]), 'spaces': int(counts[best])}
+    
+    average_participants_per_space = total_appearances / total_spaces if total_spaces > 0 else 0
+    
+    return {
+        'total_participants': int(valid.sum()),
+        'total_hosts': int(is_host.sum()),
+        'total_speakers': int(is_speaker.sum()),
+        'total_both': int((role == 'both').sum()),
+        'total_spaces': total_spaces,
+        'total_host_spaces': int(host_spaces.sum()),
+        'total_speaker_spaces': int(speaker_spaces.sum()),
+        'average_participants_per_space': round(average_participants_per_space, 2),
+        'most_active_host': most_active(is_host, host_spaces),
+        'most_active_speaker': most_active(is_speaker, speaker_spaces),
+        'last_run_date': last_run_date
+    }
+
+def materialize_stats(output_dir: str, participants: List[Dict[str, Any]], participants_version: str,
+                      total_spaces: int, total_appearances: int, last_run_date: Optional[str]) -> Dict[str, Any]:
+    """Compute stats for a data build and write stats.json atomically, stamped with the participants data version"""
+    stats = compute_stats(participants, total_spaces, total_appearances, last_run_date)
+    stats['data_version'] = participants_version
+    write_atomic(os.path.join(output_dir, STATS_FILENAME), json.dumps(stats))
+    logger.info(f"Saved stats for data version {participants_version}")
+    return stats
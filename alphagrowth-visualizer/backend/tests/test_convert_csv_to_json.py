@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'scripts'))
+
+import convert_csv_to_json as convert  # noqa: E402
+from graph_layout import LAYOUT_HEIGHT, LAYOUT_WIDTH, apply_layout  # noqa: E402
+
+SOURCE_DIR = os.path.join(TESTS_DIR, 'fixtures', 'source')
+SCRAPER_DIR = os.path.join(os.path.dirname(os.path.dirname(BACKEND_DIR)), 'src')
+EXPECTED_DIR = os.path.join(TESTS_DIR, 'fixtures', 'expected')
+
+
+@pytest.fixture(autouse=True)
+def csv_source_only(monkeypatch):
+    # Build from the fixture snapshots even when a scraper database exists on this machine
+    monkeypatch.setattr(convert, 'find_database', lambda extra_dirs=None: None)
+
+
+def load_json(directory, filename):
+    with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def assert_matches_expected(output_dir):
+    assert load_json(output_dir, 'participants_data.json') == load_json(EXPECTED_DIR, 'participants_data.json')
+
+    # Layout coordinates depend on floating point details, so they are checked for range only
+    network = load_json(output_dir, 'network_data.json')
+    for node in network['nodes']:
+        assert 0 <= node.pop('x') <= LAYOUT_WIDTH
+        assert 0 <= node.pop('y') <= LAYOUT_HEIGHT
+    assert network == load_json(EXPECTED_DIR, 'network_data.json')
+
+
+def test_build_matches_expected_outputs(tmp_path):
+    assert convert.convert_csv_to_json(source_data_dir=SOURCE_DIR, dest_data_dir=str(tmp_path))
+    assert_matches_expected(str(tmp_path))
+    assert (tmp_path / 'total_spaces.txt').read_text().strip() == '8'
+
+
+def test_incremental_build_matches_full_build(tmp_path):
+    source_dir = tmp_path / 'source'
+    output_dir = tmp_path / 'output'
+    source_dir.mkdir()
+    for filename in ['participants_20250516.csv', 'space_urls_20250518.csv']:
+        shutil.copy(os.path.join(SOURCE_DIR, filename), source_dir)
+    assert convert.convert_csv_to_json(source_data_dir=str(source_dir), dest_data_dir=str(output_dir))
+
+    # The second build folds only the new snapshot into the saved aggregate state
+    shutil.copy(os.path.join(SOURCE_DIR, 'participants_20250518.csv'), source_dir)
+    assert convert.convert_csv_to_json(source_data_dir=str(source_dir), dest_data_dir=str(output_dir))
+    assert_matches_expected(str(output_dir))
+
+
+def test_build_from_empty_snapshot(tmp_path):
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    (source_dir / 'participants_20250101.csv').write_text('space_url,role,name,alphagrowth_link,twitter_link\n')
+    assert convert.convert_csv_to_json(source_data_dir=str(source_dir), dest_data_dir=str(tmp_path / 'output'))
+    assert load_json(str(tmp_path / 'output'), 'participants_data.json') == []
+    network = load_json(str(tmp_path / 'output'), 'network_data.json')
+    assert network['nodes'] == [] and network['links'] == []
+
+
+def test_layout_of_empty_network():
+    assert apply_layout({'nodes': [], 'links': []}) == {'nodes': [], 'links': []}
+
+
+def appearance(name):
+    return {'name': name, 'alphagrowth_link': f"https://alphagrowth.io/spaces/participant/{name.lower()}",
+            'twitter_link': f"https://twitter.com/{name.lower()}"}
+
+
+def test_incremental_build_sees_rescrape_of_newest_space(tmp_path, monkeypatch):
+    sys.path.insert(0, SCRAPER_DIR)
+    from storage import ScraperDB
+
+    db_path = str(tmp_path / 'alphagrowth.db')
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    monkeypatch.setattr(convert, 'find_database', lambda extra_dirs=None: db_path)
+    with ScraperDB(db_path) as db:
+        db.record_participants('https://alphagrowth.io/spaces/s1',
+                               {'hosts': [appearance('Ann')], 'speakers': [appearance('Bob')]})
+        db.record_participants('https://alphagrowth.io/spaces/s2',
+                               {'hosts': [appearance('Cat')], 'speakers': [appearance('Dan')]})
+    assert convert.convert_csv_to_json(source_data_dir=str(source_dir), dest_data_dir=str(tmp_path / 'incremental'))
+
+    # Rescraping the most recently written space replaces its newest rows
+    with ScraperDB(db_path) as db:
+        db.record_participants('https://alphagrowth.io/spaces/s2',
+                               {'hosts': [appearance('Eve')], 'speakers': [appearance('Fay')]})
+    assert convert.convert_csv_to_json(source_data_dir=str(source_dir), dest_data_dir=str(tmp_path / 'incremental'))
+    assert convert.convert_csv_to_json(full_rebuild=True, source_data_dir=str(source_dir),
+                                       dest_data_dir=str(tmp_path / 'full'))
+
+    participants = load_json(str(tmp_path / 'incremental'), 'participants_data.json')
+    assert sorted(p['name'] for p in participants) == ['Ann', 'Bob', 'Eve', 'Fay']
+    assert participants == load_json(str(tmp_path / 'full'), 'participants_data.json')
@@ -3,6 +3,9 @@ import * as d3 from 'd3'
 import axios from 'axios'
 import { apiBaseUrl } from '../config'
 
+// The server returns the best-connected participants, so the force layout stays responsive
+const MAX_GRAPH_NODES = 1000
+
 interface NetworkGraphProps {
   onSelectParticipant: (id: string) => void
 }
@@ -37,7 +40,9 @@ const NetworkGraph = ({ onSelectParticipant }: NetworkGraphProps) => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const response = await axios.get<NetworkData>(`${apiBaseUrl}/api/network`)
+        const response = await axios.get<NetworkData>(`${apiBaseUrl}/api/network`, {
+          params: { max_nodes: MAX_GRAPH_NODES }
+        })
         setNetworkData(response.data)
         setError(null)
       } catch (error) {
@@ -72,6 +77,13 @@ const NetworkGraph = ({ onSelectParticipant }: NetworkGraphProps) => {
       return sourceNode && targetNode
     })
 
+    // The simulation mutates nodes and links, so work on copies and keep networkData pristine
+    const nodes: NetworkNode[] = filteredNodes.map(node => ({ ...node }))
+    const links: NetworkLink[] = filteredLinks.map(link => ({ ...link }))
+
+    // The data build stores force-layout coordinates on each node; use them instead of simulating
+    const precomputed = layout === 'force' && nodes.every(node => node.x != null && node.y != null)
+
         // Create SVG
         const svg = d3.select(svgRef.current)
           .attr('width', width)
@@ -90,8 +102,8 @@ const NetworkGraph = ({ onSelectParticipant }: NetworkGraphProps) => {
     const g = svg.append('g')
 
         // Create simulation
-    const simulation = d3.forceSimulation(filteredNodes)
-      .force('link', d3.forceLink(filteredLinks).id((d: any) => d.id).distance(100))
+    const simulation = d3.forceSimulation(nodes)
+      .force('link', d3.forceLink(links).id((d: any) => d.id).distance(100))
       .force('charge', d3.forceManyBody().strength(-200))
           .force('center', d3.forceCenter(width / 2, height / 2))
 
@@ -106,7 +118,7 @@ const NetworkGraph = ({ onSelectParticipant }: NetworkGraphProps) => {
         // Create links
     const link = g.append('g')
           .selectAll('line')
-      .data(filteredLinks)
+      .data(links)
           .join('line')
           .attr('stroke', '#999')
           .attr('stroke-opacity', 0.6)
@@ -115,7 +127,7 @@ const NetworkGraph = ({ onSelectParticipant }: NetworkGraphProps) => {
         // Create nodes
     const node = g.append('g')
       .selectAll('g')
-      .data(filteredNodes)
+      .data(nodes)
       .join('g')
           .call(d3.drag<any, any>()
             .on('start', dragstarted)
@@ -141,7 +153,7 @@ const NetworkGraph = ({ onSelectParticipant }: NetworkGraphProps) => {
       .text((d: any) => `${d.name}\nTwitter: ${d.twitter}\nConnections: ${filteredLinks.filter(l => l.source === d.id || l.target === d.id).length}`)
 
         // Update positions on each tick
-        simulation.on('tick', () => {
+        const ticked = () => {
           link
             .attr('x1', (d: any) => d.source.x)
             .attr('y1', (d: any) => d.source.y)
@@ -149,21 +161,38 @@ const NetworkGraph = ({ onSelectParticipant }: NetworkGraphProps) => {
             .attr('y2', (d: any) => d.target.y)
 
       node.attr('transform', (d: any) => `translate(${d.x},${d.y})`)
-        })
+        }
+
+    if (precomputed) {
+      // The link force has already resolved ids to nodes; draw once without running any ticks
+      simulation.stop()
+      ticked()
+    } else {
+      simulation.on('tick', ticked)
+    }
 
         // Drag functions
         function dragstarted(event: any) {
+          if (precomputed) return
           if (!event.active) simulation.alphaTarget(0.3).restart()
           event.subject.fx = event.subject.x
           event.subject.fy = event.subject.y
         }
 
         function dragged(event: any) {
+          if (precomputed) {
+            // Move just the dragged node; the rest of the layout stays put
+            event.subject.x = event.x
+            event.subject.y = event.y
+            ticked()
+            return
+          }
           event.subject.fx = event.x
           event.subject.fy = event.y
         }
 
         function dragended(event: any) {
+          if (precomputed) return
           if (!event.active) simulation.alphaTarget(0)
           event.subject.fx = null
           event.subject.fy = null
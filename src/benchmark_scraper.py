@@ -0,0 +1,193 @@
+import argparse
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import sys
+import tempfile
+import threading
+import time
+from get_participants import get_participants_from_csv, DEFAULT_WORKERS, DEFAULT_PARSE_WORKERS, DEFAULT_QUEUE_SIZE
+from get_space_urls import get_space_links
+from mock_alphagrowth import add_server_arguments, server_from_args
+from parsers import PARSER_CHOICES, DEFAULT_PARSER
+from rate_limiter import AdaptiveRateLimiter
+
+SCENARIOS = ['listing', 'sequential', 'concurrent', 'pipeline']
+DEFAULT_RATE = 1000.0  # high enough that the limiter only matters once the server starts throttling
+
+
+class TimingRateLimiter(AdaptiveRateLimiter):
+    """AdaptiveRateLimiter that also keeps the status and latency of every request it is told about."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = []
+        self.requests_lock = threading.Lock()
+
+    def record(self, url, status_code, elapsed, retry_after=None):
+        with self.requests_lock:
+            self.requests.append((status_code, elapsed))
+        super().record(url, status_code, elapsed, retry_after)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of `values` (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def peak_rss_mb(usage):
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def cpu_seconds(usage):
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_scenario(scenario, options, results):
+    """Run one scenario against the mock server and put its measurements on `results`.
+
+    Runs in a fresh process, so peak RSS belongs to this scenario alone.
+    Parser processes of the pipeline engine are counted through RUSAGE_CHILDREN.
+    """
+    limiter = TimingRateLimiter(options['rate'], max_rate=max(options['rate'], options['max_rate']))
+    output = contextlib.nullcontext() if options['verbose'] else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    start_self = resource.getrusage(resource.RUSAGE_SELF)
+    start_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    with output:
+        if scenario == 'listing':
+            urls = get_space_links(limiter, options['listing_workers'], existing_spaces=set(),
+                                   base_url=options['listing_url'])
+            found = len(urls)
+        else:
+            participants = get_participants_from_csv(options['urls_csv'], engine=scenario,
+                                                     workers=options['workers'], limiter=limiter,
+                                                     parser=options['parser'],
+                                                     parse_workers=options['parse_workers'],
+                                                     queue_size=options['queue_size'])
+            found = sum(len(p['hosts']) + len(p['speakers']) for p in participants.values())
+    wall = time.perf_counter() - start
+    end_self = resource.getrusage(resource.RUSAGE_SELF)
+    end_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    latencies = [elapsed for _, elapsed in limiter.requests]
+    pages = sum(1 for status, _ in limiter.requests if status == 200)
+    results.put({
+        'scenario': scenario,
+        'found': found,
+        'requests': len(limiter.requests),
+        'pages': pages,
+        'seconds': wall,
+        'pages_per_second': pages / wall if wall > 0 else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000 if latencies else None,
+        'p99_ms': percentile(latencies, 0.99) * 1000 if latencies else None,
+        'cpu_seconds': cpu_seconds(end_self) - cpu_seconds(start_self) +
+                       cpu_seconds(end_children) - cpu_seconds(start_children),
+        'peak_rss_mb': peak_rss_mb(end_self),
+        'children_peak_rss_mb': peak_rss_mb(end_children),
+        'backoffs': limiter.backoff_count,
+    })
+
+
+def write_space_urls(path, urls):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['url'])
+        for url in urls:
+            writer.writerow([url])
+
+
+def format_row(result):
+    def number(value, digits):
+        return '-' if value is None else f"{value:.{digits}f}"
+
+    return (f"{result['scenario']:<11} {result['found']:>6}/{result['expected']:<6} {result['pages']:>6} "
+            f"{number(result['pages_per_second'], 1):>8} {number(result['p50_ms'], 1):>8} "
+            f"{number(result['p99_ms'], 1):>8} {number(result['cpu_seconds'], 2):>7} "
+            f"{number(result['peak_rss_mb'], 1):>8} {number(result['children_peak_rss_mb'], 1):>8} "
+            f"{result['backoffs']:>5}  {result['server_statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark get_space_links and get_participants_from_csv against a local mock AlphaGrowth server')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS,
+                        help='listing runs get_space_links; the others run get_participants_from_csv with that engine')
+    parser.add_argument('--listing-workers', type=int, default=4, help='Listing pages fetched concurrently')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Fetch workers for the concurrent and pipeline engines')
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS,
+                        help='Parser processes for the pipeline engine')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help='Raw pages buffered between fetching and parsing (pipeline engine)')
+    parser.add_argument('--parser', choices=PARSER_CHOICES, default=DEFAULT_PARSER, help='HTML parser backend')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='Initial requests per second per host')
+    parser.add_argument('--max-rate', type=float, default=DEFAULT_RATE, help='Upper bound for the adaptive rate')
+    parser.add_argument('--json', help='Also write the results to this JSON file (for comparing runs)')
+    parser.add_argument('--verbose', action='store_true', help="Show the scrapers' own progress output")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args)
+    expected = {'listing': args.spaces}
+    expected_participants = server.site.expected_participants()
+    # A fresh interpreter per scenario keeps peak RSS and CPU time from leaking between runs
+    context = multiprocessing.get_context('spawn')
+    results = []
+    with server, tempfile.TemporaryDirectory() as tmp_dir:
+        urls_csv = os.path.join(tmp_dir, 'space_urls.csv')
+        write_space_urls(urls_csv, server.space_urls())
+        options = {
+            'listing_url': server.listing_url,
+            'urls_csv': urls_csv,
+            'listing_workers': args.listing_workers,
+            'workers': args.workers,
+            'parse_workers': args.parse_workers,
+            'queue_size': args.queue_size,
+            'parser': args.parser,
+            'rate': args.rate,
+            'max_rate': args.max_rate,
+            'verbose': args.verbose,
+        }
+
+        print(f"Mock server at {server.base_url}: {args.spaces} spaces, {expected_participants} participant entries, "
+              f"latency {args.latency * 1000:.0f}+/-{args.jitter * 1000:.0f} ms, "
+              f"error rate {args.error_rate:g}, 429 rate {args.throttle_rate:g}")
+        print(f"{'scenario':<11} {'found/expected':>13} {'pages':>6} {'pages/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'cpu s':>7} {'rss MB':>8} {'kids MB':>8} {'backoffs':>5}  server statuses")
+        for scenario in args.scenarios:
+            server.reset_stats()
+            result_queue = context.Queue()
+            process = context.Process(target=run_scenario, args=(scenario, options, result_queue))
+            process.start()
+            result = None
+            while result is None and (process.is_alive() or not result_queue.empty()):
+                try:
+                    result = result_queue.get(timeout=1)
+                except queue.Empty:
+                    pass
+            process.join()
+            if result is None:
+                print(f"{scenario:<11} failed (exit code {process.exitcode})")
+                continue
+            result['expected'] = expected.get(scenario, expected_participants)
+            result['server_statuses'] = server.stats()
+            results.append(result)
+            print(format_row(result))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+        print(f"Results saved to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,96 +1,246 @@
 import csv
+import multiprocessing
 import requests
-from bs4 import BeautifulSoup
-import time
 import os
 from datetime import datetime
 import sys
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import random
-
-def create_session():
-    session = requests.Session()
-    retry_strategy = Retry(
-        total=3,  # number of retries
-        backoff_factor=1,  # wait 1, 2, 4 seconds between retries
-        status_forcelist=[429, 500, 502, 503, 504],  # HTTP status codes to retry on
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    return session
-
-def get_participants_from_csv(csv_filename):
-    all_participants = {}
-    session = create_session()
-    
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from http_client import create_session, fetch
+from rate_limiter import AdaptiveRateLimiter
+from journal import ParticipantJournal
+from parsers import parse_participants, DEFAULT_PARSER
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 1.0  # initial requests per second per host
+DEFAULT_MAX_RATE = 10.0
+DEFAULT_PARSE_WORKERS = os.cpu_count() or 1
+DEFAULT_QUEUE_SIZE = 64  # raw pages buffered between the fetch and parse stages
+# Parser processes must not be forked from the pipeline's already running I/O threads (a lock
+# held by one of them at fork time stays locked in the child), so they start in a fresh interpreter
+PARSE_START_METHOD = 'spawn'
+
+def fetch_page(session, space_url, limiter, cache=None):
+    """Fetch a single space page and return (content bytes, encoding), or None on failure."""
+    try:
+        response = fetch(session, space_url, limiter, cache=cache)
+        if getattr(response, 'cache_miss', False):
+            # Offline replay: skipped like a failure, so the journal and database keep what they had
+            print(f"Skipping {space_url} - not in the response cache")
+            return None
+        if response.status_code != 200:
+            print(f"Failed to fetch {space_url} - Status code: {response.status_code}")
+            return None
+        return response.content, response.encoding
+    except requests.exceptions.RequestException as e:
+        print(f"Network error processing {space_url}: {str(e)}")
+        return None
+    except Exception as e:
+        print(f"Unexpected error processing {space_url}: {str(e)}")
+        return None
+
+def parse_page(space_url, content, encoding, parser=DEFAULT_PARSER):
+    """Decode page bytes the way requests' Response.text does and extract its participants, or None on failure."""
+    try:
+        html = str(content, encoding or 'utf-8', errors='replace')
+        return parse_participants(html, space_url, backend=parser)
+    except Exception as e:
+        print(f"Unexpected error processing {space_url}: {str(e)}")
+        return None
+
+def fetch_participants(session, space_url, limiter, parser=DEFAULT_PARSER, cache=None):
+    """Fetch a single space page and return its participants.
+
+    Returns None when the page could not be fetched or parsed, so callers can
+    tell a failure apart from a space that has no hosts or speakers.
+    """
+    page = fetch_page(session, space_url, limiter, cache)
+    if page is None:
+        return None
+    return parse_page(space_url, *page, parser=parser)
+
+def load_space_urls(csv_filename):
     with open(csv_filename, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
-        space_urls = [row['url'] for row in reader]
+        return [row['url'] for row in reader]
 
+def iter_participants_sequential(space_urls, limiter, parser=DEFAULT_PARSER, cache=None):
+    session = create_session()
     for idx, space_url in enumerate(space_urls, 1):
         print(f"Fetching participants from {space_url} ({idx}/{len(space_urls)})...")
-        try:
-            # Add random delay between 1-3 seconds to avoid rate limiting
-            time.sleep(1 + random.random() * 2)
-            
-            response = session.get(space_url, timeout=30)  # Add timeout
-            if response.status_code != 200:
-                print(f"Failed to fetch {space_url} - Status code: {response.status_code}")
-                all_participants[space_url] = {'hosts': [], 'speakers': []}
+        yield space_url, fetch_participants(session, space_url, limiter, parser, cache)
+
+def iter_participants_concurrent(space_urls, limiter, workers=DEFAULT_WORKERS, parser=DEFAULT_PARSER, cache=None):
+    """Fetch space pages on a bounded thread pool sharing one connection pool.
+
+    Politeness is enforced per host by `limiter`, so adding workers hides
+    latency without raising the request rate. Results are yielded in
+    completion order.
+    """
+    session = create_session(pool_size=workers)
+
+    def fetch_one(space_url):
+        return fetch_participants(session, space_url, limiter, parser, cache)
+
+    url_iter = iter(space_urls)
+    done_count = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded number of requests in flight instead of queueing every URL up front
+        pending = {executor.submit(fetch_one, url): url for url in islice(url_iter, workers * 2)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                space_url = pending.pop(future)
+                done_count += 1
+                print(f"Fetched participants from {space_url} ({done_count}/{len(space_urls)})")
+                yield space_url, future.result()
+            for url in islice(url_iter, len(done)):
+                pending[executor.submit(fetch_one, url)] = url
+
+def iter_participants_pipelined(space_urls, limiter, workers=DEFAULT_WORKERS, parse_workers=DEFAULT_PARSE_WORKERS,
+                                queue_size=DEFAULT_QUEUE_SIZE, parser=DEFAULT_PARSER, cache=None):
+    """Two-stage pipeline: I/O threads download raw pages, a process pool parses them.
+
+    Downloaded pages wait on a bounded queue and at most `parse_workers * 2`
+    pages are being parsed at once, so when parsing falls behind the queue
+    fills up and the I/O threads block instead of buffering pages in memory.
+    Results are yielded in completion order.
+    """
+    session = create_session(pool_size=workers)
+    urls = queue.Queue()
+    pages = queue.Queue(maxsize=queue_size)
+    for url in space_urls:
+        urls.put(url)
+
+    def io_worker():
+        while True:
+            try:
+                space_url = urls.get_nowait()
+            except queue.Empty:
+                pages.put(None)  # tell the parse stage this worker is done
+                return
+            pages.put((space_url, fetch_page(session, space_url, limiter, cache)))
+
+    for _ in range(workers):
+        threading.Thread(target=io_worker, daemon=True).start()
+
+    done_count = 0
+    running_workers = workers
+    max_pending = parse_workers * 2
+    with ProcessPoolExecutor(max_workers=parse_workers,
+                             mp_context=multiprocessing.get_context(PARSE_START_METHOD)) as executor:
+        pending = {}
+
+        def report(space_url, participants):
+            nonlocal done_count
+            done_count += 1
+            print(f"Parsed participants from {space_url} ({done_count}/{len(space_urls)})")
+            return space_url, participants
+
+        while running_workers or pending:
+            if running_workers and len(pending) < max_pending:
+                item = pages.get()
+                if item is None:
+                    running_workers -= 1
+                    continue
+                space_url, page = item
+                if page is None:
+                    yield report(space_url, None)
+                else:
+                    pending[executor.submit(parse_page, space_url, *page, parser=parser)] = space_url
+                done = [future for future in pending if future.done()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield report(pending.pop(future), future.result())
+
+def iter_participants(space_urls, engine='sequential', workers=DEFAULT_WORKERS, limiter=None, parser=DEFAULT_PARSER,
+                      parse_workers=DEFAULT_PARSE_WORKERS, queue_size=DEFAULT_QUEUE_SIZE, cache=None):
+    if limiter is None:
+        limiter = AdaptiveRateLimiter(DEFAULT_RATE, max_rate=DEFAULT_MAX_RATE)
+
+    if engine == 'pipeline':
+        return iter_participants_pipelined(space_urls, limiter, workers=workers, parse_workers=parse_workers,
+                                           queue_size=queue_size, parser=parser, cache=cache)
+    elif engine == 'concurrent':
+        return iter_participants_concurrent(space_urls, limiter, workers=workers, parser=parser, cache=cache)
+    elif engine == 'sequential':
+        return iter_participants_sequential(space_urls, limiter, parser=parser, cache=cache)
+    raise ValueError(f"Unknown engine: {engine}")
+
+def get_participants_from_csv(csv_filename, engine='sequential', workers=DEFAULT_WORKERS, limiter=None,
+                              parser=DEFAULT_PARSER, parse_workers=DEFAULT_PARSE_WORKERS, queue_size=DEFAULT_QUEUE_SIZE,
+                              cache=None):
+    """Scrape every space in `csv_filename`; spaces whose page failed are left out of the result."""
+    space_urls = load_space_urls(csv_filename)
+    fetched = dict(iter_participants(space_urls, engine=engine, workers=workers, limiter=limiter, parser=parser,
+                                     parse_workers=parse_workers, queue_size=queue_size, cache=cache))
+    failed = sum(1 for participants in fetched.values() if participants is None)
+    if failed:
+        print(f"Failed to fetch {failed} of {len(space_urls)} spaces")
+    # Keep the CSV order regardless of the order in which pages completed
+    return {space_url: fetched[space_url] for space_url in space_urls if fetched[space_url] is not None}
+
+def scrape_participants_to_journal(csv_filename, journal_path, resume=False, engine='sequential',
+                                   workers=DEFAULT_WORKERS, limiter=None, parser=DEFAULT_PARSER,
+                                   parse_workers=DEFAULT_PARSE_WORKERS, queue_size=DEFAULT_QUEUE_SIZE, cache=None,
+                                   db=None):
+    """Scrape every space in `csv_filename`, appending each result to the journal as it finishes.
+
+    Nothing is accumulated in memory; with `resume=True` spaces already in the
+    journal are skipped. Spaces whose page failed are not journaled, so a
+    resumed run retries them. When a ScraperDB is given each space is also
+    written to it as it finishes. Returns the number of spaces fetched in this run.
+    """
+    space_urls = load_space_urls(csv_filename)
+    with ParticipantJournal(journal_path, resume=resume) as journal:
+        if resume:
+            completed = journal.completed_urls()
+            space_urls = [url for url in space_urls if url not in completed]
+            print(f"Resuming: {len(completed)} spaces already journaled, {len(space_urls)} remaining")
+
+        fetched = failed = 0
+        for space_url, participants in iter_participants(space_urls, engine=engine, workers=workers,
+                                                         limiter=limiter, parser=parser,
+                                                         parse_workers=parse_workers, queue_size=queue_size,
+                                                         cache=cache):
+            if participants is None:
+                # Leave failures out of the journal and the DB: resume retries them, stored appearances stay
+                failed += 1
                 continue
+            journal.append(space_url, participants)
+            if db is not None:
+                db.record_participants(space_url, participants)
+            fetched += 1
+    if failed:
+        print(f"Failed to fetch {failed} spaces; run again with --resume to retry them")
+    return fetched
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            participants = {'hosts': [], 'speakers': []}
-
-            def extract_participant_info(header_text):
-                try:
-                    h2 = soup.find('h2', class_='hero-title', string=header_text)
-                    if not h2:
-                        print(f"No {header_text} section found for {space_url}")
-                        return []
-
-                    container = h2.find_next_sibling()
-                    if not container:
-                        print(f"No container found for {header_text} in {space_url}")
-                        return []
-
-                    results = []
-                    name_links = container.select('a.text-white[href^="/spaces/participant/"]')
-                    twitter_links = container.select('a[href^="https://twitter.com/"]')
-
-                    for i, name_link in enumerate(name_links):
-                        participant = {
-                            'name': name_link.text.strip(),
-                            'alphagrowth_link': "https://alphagrowth.io" + name_link['href'],
-                            'twitter_link': twitter_links[i]['href'] if i < len(twitter_links) else None
-                        }
-                        results.append(participant)
-
-                    return results
-                except Exception as e:
-                    print(f"Error extracting {header_text} info from {space_url}: {str(e)}")
-                    return []
-
-            # Try to get hosts and speakers, continue even if one fails
-            participants['hosts'] = extract_participant_info('Host')
-            participants['speakers'] = extract_participant_info('Speaker')
-
-            all_participants[space_url] = participants
-
-        except requests.exceptions.RequestException as e:
-            print(f"Network error processing {space_url}: {str(e)}")
-            all_participants[space_url] = {'hosts': [], 'speakers': []}
-        except Exception as e:
-            print(f"Unexpected error processing {space_url}: {str(e)}")
-            all_participants[space_url] = {'hosts': [], 'speakers': []}
-
-    return all_participants
+def save_journal_to_csv(journal_path, output_path):
+    """Stream a participant journal into the participants CSV format."""
+    seen = set()
+
+    def records():
+        for space_url, participants in ParticipantJournal(journal_path, resume=True).iter_records():
+            if space_url not in seen:
+                seen.add(space_url)
+                yield space_url, participants
+
+    return save_participants_to_csv(records(), output_path)
 
 def save_participants_to_csv(participants, output_path):
+    """Write participants to CSV.
+
+    `participants` is either the dict returned by get_participants_from_csv or
+    an iterable of (space_url, participants) pairs. Returns (spaces, hosts, speakers) counts.
+    """
     # Create the data directory if it doesn't exist
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if isinstance(participants, dict):
+        participants = participants.items()
+    total_spaces = total_hosts = total_speakers = 0
     
     with open(output_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
@@ -98,7 +248,10 @@ def save_participants_to_csv(participants, output_path):
         writer.writerow(['space_url', 'role', 'name', 'alphagrowth_link', 'twitter_link'])
         
         # Write data
-        for space_url, data in participants.items():
+        for space_url, data in participants:
+            total_spaces += 1
+            total_hosts += len(data['hosts'])
+            total_speakers += len(data['speakers'])
             for role in ['hosts', 'speakers']:
                 for participant in data[role]:
                     writer.writerow([
@@ -108,6 +261,7 @@ def save_participants_to_csv(participants, output_path):
                         participant['alphagrowth_link'],
                         participant['twitter_link']
                     ])
+    return total_spaces, total_hosts, total_speakers
 
 if __name__ == "__main__":
     # Get the script directory and construct paths
@@ -1,101 +1,121 @@
-import requests
 from bs4 import BeautifulSoup
-import time
 import csv
 import os
 from datetime import datetime
 import json
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+from http_client import create_session, fetch
+from rate_limiter import AdaptiveRateLimiter
+from storage import ScraperDB, DEFAULT_DB_PATH
 
 BASE_URL = "https://alphagrowth.io/spaces/?page="
 
-def load_existing_spaces():
-    """Load existing spaces from the CSV file."""
+def load_existing_spaces(db_path=DEFAULT_DB_PATH):
+    """Open the known-space store, merging in any space_urls CSV snapshots it has not seen yet."""
+    store = ScraperDB(db_path)
+    added = store.merge_space_snapshots()
+    if added:
+        print(f"Merged {added} space URLs from CSV snapshots into {db_path}")
+    return store
+
+def fetch_listing_page(session, page, limiter, base_url=BASE_URL):
+    """Fetch one listing page; returns (status_code, element_count, space_urls)."""
+    response = fetch(session, f"{base_url}{page}", limiter)
+    if response.status_code != 200:
+        return response.status_code, 0, []
+
+    soup = BeautifulSoup(response.text, 'html.parser')
+    elements = soup.select('li[onclick*="/spaces/"]')
+    urls = []
+    for elem in elements:
+        onclick_value = elem.get('onclick', '')
+        if "window.location=" in onclick_value:
+            start = onclick_value.find("'") + 1
+            end = onclick_value.rfind("'")
+            path = onclick_value[start:end]
+            urls.append(urljoin(base_url, path))
+    return response.status_code, len(elements), urls
+
+def iter_listing_pages(session, limiter, workers=1, base_url=BASE_URL):
+    """Yield (page, future) for pages 1, 2, 3... in order, keeping `workers` pages in flight.
+
+    The caller stops by closing the generator; pages fetched ahead of that
+    point are discarded and ones not yet started are cancelled.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = {}
+    next_page = 1
+    page = 1
     try:
-        # Look for the most recent space_urls CSV file
-        data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
-        space_urls_files = [f for f in os.listdir(data_dir) if f.startswith('space_urls_') and f.endswith('.csv')]
-        
-        if not space_urls_files:
-            print("No space_urls CSV file found!")
-            return set()
-            
-        latest_file = sorted(space_urls_files)[-1]
-        csv_path = os.path.join(data_dir, latest_file)
-        
-        existing_spaces = set()
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                existing_spaces.add(row['url'])
-                
-        print(f"Loaded existing spaces from {latest_file}: {sorted(list(existing_spaces))[:5]}...")  # Print first 5 for debugging
-        return existing_spaces
-    except Exception as e:
-        print(f"Error loading existing spaces: {str(e)}")
-        return set()
+        while True:
+            # Slide the window forward so the next `workers` pages are always being fetched
+            while next_page < page + workers:
+                futures[next_page] = executor.submit(fetch_listing_page, session, next_page, limiter, base_url)
+                next_page += 1
+            yield page, futures.pop(page)
+            page += 1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
-def get_space_links():
+def get_space_links(limiter=None, workers=1, existing_spaces=None, base_url=BASE_URL):
+    if limiter is None:
+        limiter = AdaptiveRateLimiter(1.0)
+    if existing_spaces is None:
+        with load_existing_spaces() as existing_spaces:
+            return get_space_links(limiter, workers, existing_spaces, base_url)
+    session = create_session(pool_size=workers)
     space_urls = []
-    existing_spaces = load_existing_spaces()
     print(f"Found {len(existing_spaces)} existing spaces")
     
-    page = 1
-    while True:
+    pages = iter_listing_pages(session, limiter, workers, base_url)
+    for page, future in pages:
         print(f"\nFetching page {page}...")
         try:
-            response = requests.get(f"{BASE_URL}{page}")
-            print(f"Response status code: {response.status_code}")
+            status_code, element_count, page_urls = future.result()
+            print(f"Response status code: {status_code}")
             
-            if response.status_code != 200:
+            if status_code != 200:
                 print(f"Failed to fetch page {page}")
                 break
                 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            elements = soup.select('li[onclick*="/spaces/"]')
-            print(f"Found {len(elements)} space elements on page {page}")
+            print(f"Found {element_count} space elements on page {page}")
             
-            if not elements:
+            if not element_count:
                 print("No more spaces found")
                 break
                 
             found_existing = False
-            for elem in elements:
-                onclick_value = elem.get('onclick', '')
-                if "window.location=" in onclick_value:
-                    start = onclick_value.find("'") + 1
-                    end = onclick_value.rfind("'")
-                    path = onclick_value[start:end]
-                    full_url = "https://alphagrowth.io" + path
+            for full_url in page_urls:
+                # If we find an existing space, we can stop
+                if full_url in existing_spaces:
+                    print(f"Found existing space: {full_url}")
+                    found_existing = True
+                    break
                     
-                    # If we find an existing space, we can stop
-                    if full_url in existing_spaces:
-                        print(f"Found existing space: {full_url}")
-                        found_existing = True
-                        break
-                        
-                    space_urls.append(full_url)
-                    print(f"Added new space: {full_url}")
+                space_urls.append(full_url)
+                print(f"Added new space: {full_url}")
             
             if found_existing:
                 print("Found existing space, stopping")
                 break
-                
-            page += 1
-            time.sleep(1)  # polite delay between requests
             
         except Exception as e:
             print(f"Error processing page {page}: {str(e)}")
             break
+    pages.close()
     
     print(f"\nFound {len(space_urls)} new spaces")
     return space_urls
 
-def get_space_links_and_save_csv(output_path):
+def get_space_links_and_save_csv(output_path, limiter=None, workers=1, db_path=DEFAULT_DB_PATH):
     # Create the data directory if it doesn't exist
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
     # Get the space URLs
-    links = get_space_links()
+    with load_existing_spaces(db_path) as existing_spaces:
+        links = get_space_links(limiter, workers, existing_spaces)
+        existing_spaces.add_spaces(links)
     
     # Save to CSV
     with open(output_path, 'w', newline='') as f:
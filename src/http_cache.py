@@ -0,0 +1,173 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_TTL = 24 * 60 * 60  # seconds before a cached page is revalidated
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+CACHED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ResponseCache:
+    """On-disk cache of successful GET responses, keyed by URL.
+
+    Bodies are stored gzip-compressed under the SHA-256 of their content, so
+    identical pages share one blob; a small JSON entry per URL records the
+    validators (ETag / Last-Modified) used to revalidate it. Entries younger
+    than `ttl` are served without contacting the server. With `offline=True`
+    the network is never used and misses come back as 504, like an
+    `only-if-cached` request.
+    """
+
+    def __init__(self, cache_dir, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, offline=False):
+        self.cache_dir = cache_dir
+        self.entries_dir = os.path.join(cache_dir, 'entries')
+        self.blobs_dir = os.path.join(cache_dir, 'blobs')
+        os.makedirs(self.entries_dir, exist_ok=True)
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.lock = threading.Lock()
+        self.total_bytes = sum(entry.stat().st_size for entry in os.scandir(self.blobs_dir))
+        self.hits = self.revalidated = self.misses = 0
+
+    def _entry_path(self, url):
+        return os.path.join(self.entries_dir, _sha256(url.encode('utf-8')) + '.json')
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest + '.gz')
+
+    def lookup(self, url):
+        try:
+            with open(self._entry_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(self._blob_path(entry['body'])):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        return self.ttl is not None and time.time() - entry['validated_at'] < self.ttl
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry is None:
+            return headers
+        if entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if entry['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def store(self, url, response):
+        """Cache a 200 response."""
+        digest = _sha256(response.content)
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            data = gzip.compress(response.content)
+            _write_atomic(blob_path, data)
+            with self.lock:
+                self.total_bytes += len(data)
+        now = time.time()
+        entry = {
+            'url': url,
+            'headers': {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers},
+            'body': digest,
+            'fetched_at': now,
+            'validated_at': now,
+        }
+        _write_atomic(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def revalidate(self, url, entry, response):
+        """Record a 304: the cached body is still current."""
+        entry['validated_at'] = time.time()
+        for name in CACHED_HEADERS:
+            if name in response.headers:
+                entry['headers'][name] = response.headers[name]
+        _write_atomic(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+
+    def to_response(self, url, entry):
+        """Rebuild a requests Response from a cache entry."""
+        with open(self._blob_path(entry['body']), 'rb') as f:
+            content = gzip.decompress(f.read())
+        response = Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = content
+        response.from_cache = True
+        return response
+
+    def miss_response(self, url):
+        """504 for a URL that offline mode cannot serve; `cache_miss` tells it apart from a real gateway timeout."""
+        response = Response()
+        response.status_code = 504
+        response.url = url
+        response.reason = 'Not cached (offline mode)'
+        response._content = b''
+        response.cache_miss = True
+        return response
+
+    def evict(self):
+        """Drop the least recently validated entries until the cache is under 90% of max_bytes."""
+        with self.lock:
+            entries = []
+            for item in os.scandir(self.entries_dir):
+                try:
+                    with open(item.path, 'r', encoding='utf-8') as f:
+                        entries.append((json.load(f), item.path))
+                except (OSError, ValueError):
+                    continue
+            entries.sort(key=lambda pair: pair[0]['validated_at'])
+
+            referenced = {}
+            for entry, _ in entries:
+                referenced[entry['body']] = referenced.get(entry['body'], 0) + 1
+
+            target = self.max_bytes * 0.9
+            for entry, path in entries:
+                if self.total_bytes <= target:
+                    break
+                os.remove(path)
+                referenced[entry['body']] -= 1
+                if referenced[entry['body']] == 0:
+                    blob_path = self._blob_path(entry['body'])
+                    try:
+                        size = os.path.getsize(blob_path)
+                        os.remove(blob_path)
+                        self.total_bytes -= size
+                    except OSError:
+                        pass
+
+    def record(self, outcome):
+        with self.lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'size_bytes': self.total_bytes,
+        }
@@ -0,0 +1,56 @@
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rate_limiter import THROTTLE_STATUSES
+
+def create_session(pool_size=10):
+    session = requests.Session()
+    retry_strategy = Retry(
+        total=3,  # number of retries
+        backoff_factor=1,  # wait 1, 2, 4 seconds between retries
+        # 429/503 are left to the rate limiter so it can see them and slow down
+        status_forcelist=[500, 502, 504],  # HTTP status codes to retry on
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch(session, url, limiter, timeout=30, max_attempts=4, cache=None):
+    """GET `url` through `limiter`, retrying throttled (429/503) responses after the limiter backs off.
+
+    With a ResponseCache, fresh entries are served from disk, stale ones are
+    revalidated with If-None-Match / If-Modified-Since, and 200s are stored.
+    """
+    entry = None
+    if cache is not None:
+        entry = cache.lookup(url)
+        if entry is not None and (cache.offline or cache.is_fresh(entry)):
+            cache.record('hits')
+            return cache.to_response(url, entry)
+        if cache.offline:
+            cache.record('misses')
+            return cache.miss_response(url)
+
+    headers = cache.conditional_headers(entry) if cache is not None else {}
+    for attempt in range(1, max_attempts + 1):
+        limiter.acquire(url)
+        start = time.monotonic()
+        response = session.get(url, timeout=timeout, headers=headers)
+        limiter.record(url, response.status_code, time.monotonic() - start,
+                       response.headers.get('Retry-After'))
+        if response.status_code not in THROTTLE_STATUSES:
+            break
+        print(f"Throttled on {url} - Status code: {response.status_code} (attempt {attempt}/{max_attempts})")
+
+    if cache is not None:
+        if response.status_code == 304 and entry is not None:
+            cache.record('revalidated')
+            cache.revalidate(url, entry, response)
+            return cache.to_response(url, entry)
+        cache.record('misses')
+        if response.status_code == 200:
+            cache.store(url, response)
+    return response
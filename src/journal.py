@@ -0,0 +1,58 @@
+import json
+import os
+
+
+class ParticipantJournal:
+    """Append-only JSONL log with one line per finished space.
+
+    Each record is flushed as soon as the space is done, so a crashed run can
+    be resumed by skipping the URLs already present in the journal.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if not resume and os.path.exists(path):
+            os.remove(path)
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def iter_records(self):
+        """Yield (space_url, participants) for every complete journal line."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves a truncated last line; that space is simply refetched
+                    continue
+                yield record['space_url'], record['participants']
+
+    def completed_urls(self):
+        return {space_url for space_url, _ in self.iter_records()}
+
+    def append(self, space_url, participants):
+        if self.file is None:
+            needs_newline = False
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b'\n'
+            self.file = open(self.path, 'a', encoding='utf-8')
+            if needs_newline:
+                # Terminate a truncated line so it does not swallow the next record
+                self.file.write('\n')
+        self.file.write(json.dumps({'space_url': space_url, 'participants': participants}, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
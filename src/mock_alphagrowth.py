@@ -0,0 +1,225 @@
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_SPACES = 500
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_POOL_SIZE = 2000  # distinct participants spread over all spaces
+DEFAULT_PAGE_BYTES = 30000  # filler markup so pages cost roughly what real ones do to parse
+
+LISTING_PATH = '/spaces/'
+SPACE_PREFIX = '/spaces/space-'
+PARTICIPANT_PREFIX = '/spaces/participant/'
+
+
+class SyntheticSite:
+    """Deterministic stand-in for alphagrowth.io content.
+
+    Listing page p holds spaces (p - 1) * page_size ... p * page_size - 1 as
+    `li[onclick*="/spaces/"]` items (and nothing past the last space); each
+    space page has Host and Speaker sections drawn from a fixed participant
+    pool, so a scrape can be checked against `expected_participants()`.
+    """
+
+    def __init__(self, spaces=DEFAULT_SPACES, page_size=DEFAULT_PAGE_SIZE, pool_size=DEFAULT_POOL_SIZE,
+                 page_bytes=DEFAULT_PAGE_BYTES, seed=0):
+        self.spaces = spaces
+        self.page_size = page_size
+        self.pool_size = pool_size
+        self.seed = seed
+        self.filler = self._filler(page_bytes)
+
+    @staticmethod
+    def _filler(page_bytes):
+        block = ('<div class="card"><span class="label">Related space</span>'
+                 '<a class="link" href="/spaces/related">Listen again</a></div>\n')
+        return block * (page_bytes // len(block))
+
+    def roster(self, space):
+        """(hosts, speakers) of a space as lists of participant numbers"""
+        rng = random.Random(self.seed * 1_000_003 + space)
+        hosts = rng.sample(range(self.pool_size), rng.randint(1, 2))
+        speakers = [p for p in rng.sample(range(self.pool_size), rng.randint(0, 8)) if p not in hosts]
+        return hosts, speakers
+
+    def expected_participants(self):
+        """Total host and speaker entries over every space"""
+        return sum(len(hosts) + len(speakers) for hosts, speakers in map(self.roster, range(self.spaces)))
+
+    def listing_page(self, page):
+        first = (page - 1) * self.page_size
+        items = ''.join(f'<li class="space" onclick="window.location=\'{SPACE_PREFIX}{i}\'">Space {i}</li>\n'
+                        for i in range(max(first, 0), min(first + self.page_size, self.spaces)))
+        return f'<html><body><ul class="spaces">\n{items}</ul>\n{self.filler}</body></html>'
+
+    @staticmethod
+    def _section(title, participants):
+        links = ''.join(f'<div class="participant"><a class="text-white name" href="{PARTICIPANT_PREFIX}user-{p}">'
+                        f' Participant {p} </a><a href="https://twitter.com/user_{p}">@user_{p}</a></div>\n'
+                        for p in participants)
+        return f'<h2 class="hero-title">{title}</h2>\n<div class="participants">\n{links}</div>\n'
+
+    def space_page(self, space):
+        hosts, speakers = self.roster(space)
+        return (f'<html><head><title>Space {space}</title></head><body>\n'
+                f'{self._section("Host", hosts)}{self._section("Speaker", speakers)}{self.filler}</body></html>')
+
+
+class MockAlphaGrowthServer:
+    """Threaded HTTP server for a SyntheticSite with injectable latency and failures.
+
+    Every request waits `latency` seconds (uniformly +/- `jitter`), then fails
+    with a 429 carrying `Retry-After: retry_after` with probability
+    `throttle_rate`, or with `error_status` with probability `error_rate`.
+    Responses use HTTP/1.1 keep-alive like the real site. `stats()` counts the
+    statuses served since the last `reset_stats()`.
+    """
+
+    def __init__(self, site, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500,
+                 throttle_rate=0.0, retry_after=1.0, seed=0):
+        self.site = site
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.statuses = Counter()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def listing_url(self):
+        """Value for get_space_links(base_url=...)"""
+        return f"{self.base_url}{LISTING_PATH}?page="
+
+    def space_urls(self):
+        return [f"{self.base_url}{SPACE_PREFIX}{i}" for i in range(self.site.spaces)]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this, Nagle plus delayed ACKs adds ~40 ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                status, headers, body = server.respond(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def respond(self, path):
+        """(status, headers, body bytes) for a GET of `path`"""
+        with self.lock:
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            roll = self.rng.random()
+        time.sleep(delay)
+
+        if roll < self.throttle_rate:
+            status, headers, body = 429, {'Retry-After': f"{self.retry_after:g}"}, b''
+        elif roll < self.throttle_rate + self.error_rate:
+            status, headers, body = self.error_status, {}, b''
+        else:
+            status, body = self._page(path)
+            headers = {'Content-Type': 'text/html; charset=utf-8'}
+        with self.lock:
+            self.statuses[status] += 1
+        return status, headers, body
+
+    def _page(self, path):
+        url = urlparse(path)
+        try:
+            if url.path == LISTING_PATH:
+                page = int(parse_qs(url.query).get('page', ['1'])[0])
+                return 200, self.site.listing_page(page).encode('utf-8')
+            if url.path.startswith(SPACE_PREFIX):
+                space = int(url.path[len(SPACE_PREFIX):])
+                if 0 <= space < self.site.spaces:
+                    return 200, self.site.space_page(space).encode('utf-8')
+        except ValueError:
+            pass
+        return 404, b'<html><body>Not found</body></html>'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_stats(self):
+        with self.lock:
+            self.statuses.clear()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.statuses)
+
+
+def add_server_arguments(parser):
+    """Command-line options shared by this module and benchmark_scraper.py"""
+    parser.add_argument('--spaces', type=int, default=DEFAULT_SPACES, help='Number of synthetic spaces')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='Spaces per listing page')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE, help='Distinct synthetic participants')
+    parser.add_argument('--page-bytes', type=int, default=DEFAULT_PAGE_BYTES,
+                        help='Filler markup added to every page')
+    parser.add_argument('--latency', type=float, default=0.02, help='Seconds the server waits before each response')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Uniform +/- spread around --latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=500, help='Status code for injected errors')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with each 429')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic content and injected failures')
+
+
+def server_from_args(args, port=0):
+    site = SyntheticSite(args.spaces, args.page_size, args.pool_size, args.page_bytes, args.seed)
+    return MockAlphaGrowthServer(site, port=port, latency=args.latency, jitter=args.jitter,
+                                 error_rate=args.error_rate, error_status=args.error_status,
+                                 throttle_rate=args.throttle_rate, retry_after=args.retry_after, seed=args.seed)
+
+
+if __name__ == "__main__":
+    # Serve the synthetic site until interrupted, e.g. for manual runs of scraper.py against it
+    parser = argparse.ArgumentParser(description='Local stand-in for alphagrowth.io')
+    parser.add_argument('--port', type=int, default=8800, help='Port to listen on')
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    server = server_from_args(args, port=args.port)
+    print(f"Serving {args.spaces} synthetic spaces at {server.listing_url}1 (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
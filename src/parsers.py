@@ -0,0 +1,163 @@
+import sys
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional; fall back to BeautifulSoup's pure-Python parser
+    lxml = None
+
+ALPHAGROWTH_URL = "https://alphagrowth.io"
+
+HERO_TITLE_XPATH = "//h2[contains(concat(' ', normalize-space(@class), ' '), ' hero-title ')]"
+PARTICIPANT_LINK_XPATH = (".//a[contains(concat(' ', normalize-space(@class), ' '), ' text-white ')"
+                          " and starts-with(@href, '/spaces/participant/')]")
+TWITTER_LINK_XPATH = ".//a[starts-with(@href, 'https://twitter.com/')]"
+
+
+class SoupPageParser:
+    """Reference backend: BeautifulSoup with the stdlib html.parser."""
+
+    name = 'bs4'
+
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, 'html.parser')
+
+    def find_section_header(self, header_text):
+        return self.soup.find('h2', class_='hero-title', string=header_text)
+
+    def next_container(self, header):
+        return header.find_next_sibling()
+
+    def participant_links(self, container):
+        return [(link.text, link['href'])
+                for link in container.select('a.text-white[href^="/spaces/participant/"]')]
+
+    def twitter_links(self, container):
+        return [link['href'] for link in container.select('a[href^="https://twitter.com/"]')]
+
+
+class LxmlPageParser:
+    """Fast backend: libxml2's HTML parser queried with precompiled XPath.
+
+    Mirrors the matching rules of SoupPageParser (class token match, exact
+    header string, next element sibling) so both produce the same records.
+    """
+
+    name = 'lxml'
+
+    def __init__(self, html):
+        if isinstance(html, str):
+            # lxml rejects str input that carries an encoding declaration
+            html = html.encode('utf-8')
+        self.root = lxml.html.document_fromstring(html) if html.strip() else None
+
+    @staticmethod
+    def _string(element):
+        # Same semantics as BeautifulSoup's Tag.string: a lone text node, followed through single children
+        if len(element) == 0:
+            return element.text
+        if len(element) == 1 and not element.text and not element[0].tail:
+            return LxmlPageParser._string(element[0])
+        return None
+
+    def find_section_header(self, header_text):
+        if self.root is None:
+            return None
+        for h2 in self.root.xpath(HERO_TITLE_XPATH):
+            if self._string(h2) == header_text:
+                return h2
+        return None
+
+    def next_container(self, header):
+        sibling = header.getnext()
+        while sibling is not None and not isinstance(sibling.tag, str):
+            sibling = sibling.getnext()  # skip comments and processing instructions
+        return sibling
+
+    def participant_links(self, container):
+        return [(link.text_content(), link.get('href')) for link in container.xpath(PARTICIPANT_LINK_XPATH)]
+
+    def twitter_links(self, container):
+        return [link.get('href') for link in container.xpath(TWITTER_LINK_XPATH)]
+
+
+PARSER_BACKENDS = {'bs4': SoupPageParser}
+if lxml is not None:
+    PARSER_BACKENDS['lxml'] = LxmlPageParser
+PARSER_CHOICES = ['bs4', 'lxml']
+DEFAULT_PARSER = 'lxml' if lxml is not None else 'bs4'
+
+
+def get_parser_backend(name):
+    """Return the parser class for `name`, falling back to BeautifulSoup if it is unavailable."""
+    if name not in PARSER_CHOICES:
+        raise ValueError(f"Unknown parser backend: {name}")
+    if name not in PARSER_BACKENDS:
+        print(f"Parser backend '{name}' is not installed, falling back to bs4")
+        return SoupPageParser
+    return PARSER_BACKENDS[name]
+
+
+def extract_participant_info(page, header_text, space_url):
+    """Return the participants listed under the `header_text` section of a parsed page."""
+    try:
+        h2 = page.find_section_header(header_text)
+        if h2 is None:
+            print(f"No {header_text} section found for {space_url}")
+            return []
+
+        container = page.next_container(h2)
+        if container is None:
+            print(f"No container found for {header_text} in {space_url}")
+            return []
+
+        results = []
+        name_links = page.participant_links(container)
+        twitter_links = page.twitter_links(container)
+
+        for i, (name, href) in enumerate(name_links):
+            participant = {
+                'name': name.strip(),
+                'alphagrowth_link': ALPHAGROWTH_URL + href,
+                'twitter_link': twitter_links[i] if i < len(twitter_links) else None
+            }
+            results.append(participant)
+
+        return results
+    except Exception as e:
+        print(f"Error extracting {header_text} info from {space_url}: {str(e)}")
+        return []
+
+
+def parse_participants(html, space_url, backend=DEFAULT_PARSER):
+    """Extract hosts and speakers from a space page."""
+    page = get_parser_backend(backend)(html)
+    # Try to get hosts and speakers, continue even if one fails
+    return {
+        'hosts': extract_participant_info(page, 'Host', space_url),
+        'speakers': extract_participant_info(page, 'Speaker', space_url),
+    }
+
+
+if __name__ == "__main__":
+    # Parity check: python parsers.py saved_page.html [...]
+    # Parses each saved page with every installed backend and reports any difference from bs4.
+    if len(sys.argv) < 2:
+        print("Usage: python parsers.py PAGE.html [PAGE.html ...]")
+        sys.exit(1)
+
+    mismatches = 0
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        expected = parse_participants(html, path, backend='bs4')
+        for name in PARSER_BACKENDS:
+            result = parse_participants(html, path, backend=name)
+            if result != expected:
+                mismatches += 1
+                print(f"MISMATCH {path}: {name} differs from bs4")
+                print(f"  bs4:   {expected}")
+                print(f"  {name}: {result}")
+
+    print(f"Checked {len(sys.argv) - 1} pages against {sorted(PARSER_BACKENDS)}: {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
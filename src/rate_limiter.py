@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket: allows `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host so each site gets its own politeness budget."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.capacity)
+            return self.buckets[host]
+
+    def acquire(self, url):
+        self.bucket_for(url).acquire()
+
+    def record(self, url, status_code, elapsed, retry_after=None):
+        """Fixed-rate limiter: responses do not change the rate."""
+
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    """Return the Retry-After delay in seconds (header may be seconds or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveRateLimiter(HostRateLimiter):
+    """Per-host token buckets whose rate follows the server's behaviour (AIMD).
+
+    Every fast 200 response raises the host's rate by `increase` requests per
+    second up to `max_rate`; a 429/503 or a Retry-After header multiplies it by
+    `decrease` (down to `min_rate`) and pauses the host for the advertised delay.
+    """
+
+    def __init__(self, initial_rate=1.0, min_rate=0.1, max_rate=10.0,
+                 increase=0.1, decrease=0.5, fast_response=1.0, max_events=1000):
+        super().__init__(initial_rate, capacity=1)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.fast_response = fast_response
+        self.blocked_until = {}
+        self.backoff_events = deque(maxlen=max_events)
+        self.backoff_count = 0
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        while True:
+            with self.lock:
+                wait = self.blocked_until.get(host, 0) - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        self.bucket_for(url).acquire()
+
+    def record(self, url, status_code, elapsed, retry_after=None):
+        """Feed back the outcome of a request made after acquire(url)."""
+        host = urlparse(url).netloc
+        bucket = self.bucket_for(url)
+        delay = parse_retry_after(retry_after)
+        with self.lock:
+            if status_code in THROTTLE_STATUSES or delay is not None:
+                rate = max(self.min_rate, bucket.rate * self.decrease)
+                pause = delay if delay is not None else 1.0 / rate
+                self.blocked_until[host] = max(self.blocked_until.get(host, 0), time.monotonic() + pause)
+                self.backoff_count += 1
+                self.backoff_events.append({
+                    'time': time.time(),
+                    'host': host,
+                    'status_code': status_code,
+                    'retry_after': delay,
+                    'rate': rate,
+                })
+            elif status_code == 200 and elapsed < self.fast_response:
+                rate = min(self.max_rate, bucket.rate + self.increase)
+            else:
+                return
+        bucket.set_rate(rate)
+
+    def current_rate(self, url=None):
+        """Current rate for the host of `url`, or the per-host rates when no url is given."""
+        if url is not None:
+            return self.bucket_for(url).rate
+        with self.lock:
+            return {host: bucket.rate for host, bucket in self.buckets.items()}
+
+    def stats(self):
+        return {
+            'rates': self.current_rate(),
+            'backoff_count': self.backoff_count,
+            'recent_backoffs': list(self.backoff_events)[-10:],
+        }
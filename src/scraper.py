@@ -2,70 +2,112 @@ import argparse
 import sys
 import os
 from get_space_urls import get_space_links_and_save_csv
-from get_participants import get_participants_from_csv
-import csv
+from get_participants import scrape_participants_to_journal, save_journal_to_csv, DEFAULT_WORKERS, \
+    DEFAULT_RATE, DEFAULT_MAX_RATE, DEFAULT_PARSE_WORKERS, DEFAULT_QUEUE_SIZE
+from rate_limiter import AdaptiveRateLimiter
+from parsers import PARSER_CHOICES, DEFAULT_PARSER
+from storage import ScraperDB, DEFAULT_DB_PATH
+from http_cache import ResponseCache, DEFAULT_TTL, DEFAULT_MAX_BYTES
 from datetime import datetime
 
 # Define constants for file paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_CSV_PATH = os.path.join(SCRIPT_DIR, '..', 'data', 'space_urls.csv')
+DEFAULT_JOURNAL_PATH = os.path.join(SCRIPT_DIR, '..', 'data', 'participants_journal.jsonl')
+DEFAULT_CACHE_DIR = os.path.join(SCRIPT_DIR, '..', 'data', 'http_cache')
 
 def main():
     parser = argparse.ArgumentParser(description='AlphaGrowth Spaces Scraper')
-    parser.add_argument('command', choices=['get_urls', 'get_participants'],
-                        help='Command to run: get_urls or get_participants')
+    parser.add_argument('command', choices=['get_urls', 'get_participants', 'import_csv'],
+                        help='Command to run: get_urls, get_participants or import_csv '
+                             '(load the CSV snapshots in data/ into the database)')
     parser.add_argument('--urls_csv', default=DEFAULT_CSV_PATH,
                         help='CSV file to save/read space URLs')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH,
+                        help='SQLite database of spaces and participants (CSV snapshots in data/ are merged into it)')
+    parser.add_argument('--listing-workers', type=int, default=1,
+                        help='Listing pages fetched concurrently by get_urls (results are still processed in page order)')
+    parser.add_argument('--engine', choices=['sequential', 'concurrent', 'pipeline'], default='sequential',
+                        help='Fetch engine for get_participants')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Number of concurrent fetch workers (concurrent and pipeline engines)')
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS,
+                        help='Number of parser processes (pipeline engine only)')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help='Raw pages buffered between fetching and parsing (pipeline engine only)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help='Initial requests per second per host')
+    parser.add_argument('--max-rate', type=float, default=DEFAULT_MAX_RATE,
+                        help='Upper bound for the adaptive request rate (set equal to --rate for a fixed rate)')
+    parser.add_argument('--parser', choices=PARSER_CHOICES, default=DEFAULT_PARSER,
+                        help='HTML parser backend for space pages (falls back to bs4 if lxml is missing)')
+    parser.add_argument('--journal', default=DEFAULT_JOURNAL_PATH,
+                        help='JSONL journal that get_participants appends each finished space to')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip spaces already in the journal instead of starting a fresh one')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='Directory for the space page response cache')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always download space pages instead of using the response cache')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL / 3600,
+                        help='Hours before a cached space page is revalidated with the server')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help='Size limit of the response cache; oldest pages are evicted beyond it')
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay space pages from the response cache without any network access '
+                             '(spaces missing from the cache are skipped, not recorded)')
 
     args = parser.parse_args()
+    limiter = AdaptiveRateLimiter(args.rate, max_rate=max(args.rate, args.max_rate))
+    cache = None
 
     if args.command == 'get_urls':
         print('Running URL retrieval...')
         try:
-            get_space_links_and_save_csv(args.urls_csv)
+            get_space_links_and_save_csv(args.urls_csv, limiter, args.listing_workers, args.db)
         except Exception as e:
             print(f"Error during URL retrieval: {e}")
             sys.exit(1)
     elif args.command == 'get_participants':
         print('Running participant retrieval...')
+        if not args.no_cache or args.offline:
+            cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl * 3600,
+                                  max_bytes=int(args.cache_max_mb * 1024 * 1024), offline=args.offline)
         try:
-            participants = get_participants_from_csv(args.urls_csv)
-            total_hosts = sum(len(p['hosts']) for p in participants.values())
-            total_speakers = sum(len(p['speakers']) for p in participants.values())
+            with ScraperDB(args.db) as db:
+                fetched = scrape_participants_to_journal(args.urls_csv, args.journal, resume=args.resume,
+                                                         engine=args.engine, workers=args.workers, limiter=limiter,
+                                                         parser=args.parser, parse_workers=args.parse_workers,
+                                                         queue_size=args.queue_size, cache=cache, db=db)
+                print(f'Spaces fetched this run: {fetched}')
+
+                # Save participants to CSV
+                output_filename = f'participants_{datetime.now().strftime("%Y%m%d")}.csv'
+                output_path = os.path.join(os.path.dirname(args.urls_csv), output_filename)
+                total_spaces, total_hosts, total_speakers = save_journal_to_csv(args.journal, output_path)
+                # The rows are already in the database; don't import the snapshot a second time
+                db.mark_imported(output_path)
+            print(f'Total spaces in journal: {total_spaces}')
             print(f'Total hosts found: {total_hosts}')
             print(f'Total speakers found: {total_speakers}')
             
-            # Save participants to CSV
-            output_filename = f'participants_{datetime.now().strftime("%Y%m%d")}.csv'
-            output_path = os.path.join(os.path.dirname(args.urls_csv), output_filename)
-            
-            # Create the data directory if it doesn't exist
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            with open(output_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                # Write header
-                writer.writerow(['space_url', 'role', 'name', 'alphagrowth_link', 'twitter_link'])
-                
-                # Write data
-                for space_url, data in participants.items():
-                    for role in ['hosts', 'speakers']:
-                        for participant in data[role]:
-                            writer.writerow([
-                                space_url,
-                                role,
-                                participant['name'],
-                                participant['alphagrowth_link'],
-                                participant['twitter_link']
-                            ])
-            
             print(f'Results saved to: {output_path}')
         except Exception as e:
             print(f"Error during participant retrieval: {e}")
             sys.exit(1)
+    elif args.command == 'import_csv':
+        with ScraperDB(args.db) as db:
+            spaces_added, spaces_imported = db.merge_snapshots()
+        print(f'Imported {spaces_added} new space URLs and participants for {spaces_imported} spaces into {args.db}')
     else:
         print('Unknown command')
         sys.exit(1)
 
+    stats = limiter.stats()
+    print(f"Final request rates: {stats['rates']}")
+    print(f"Backoff events: {stats['backoff_count']}")
+    if cache is not None:
+        print(f"Response cache: {cache.stats()}")
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,209 @@
+import csv
+import os
+import sqlite3
+from datetime import datetime
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, 'alphagrowth.db')
+
+# AUTOINCREMENT ids are never reused, so they only grow as rows are written; the
+# visualizer's incremental build uses them as a watermark that a rescrape always moves past
+APPEARANCES_TABLE = """
+CREATE TABLE IF NOT EXISTS appearances (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    space_id INTEGER NOT NULL REFERENCES spaces (id),
+    participant_id INTEGER NOT NULL REFERENCES participants (id),
+    role TEXT NOT NULL,
+    scraped_at TEXT NOT NULL,
+    UNIQUE (space_id, participant_id, role)
+);"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spaces (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    first_seen TEXT NOT NULL,
+    scraped_at TEXT
+);
+CREATE TABLE IF NOT EXISTS participants (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    alphagrowth_link TEXT NOT NULL,
+    twitter_link TEXT,
+    UNIQUE (alphagrowth_link, name)
+);
+""" + APPEARANCES_TABLE + """
+CREATE INDEX IF NOT EXISTS appearances_participant ON appearances (participant_id);
+CREATE INDEX IF NOT EXISTS appearances_scraped_at ON appearances (scraped_at);
+CREATE TABLE IF NOT EXISTS imported_files (
+    filename TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    imported_at TEXT NOT NULL
+);
+"""
+
+
+class ScraperDB:
+    """SQLite store shared by the scrapers and the visualizer backend.
+
+    `spaces` holds every space URL ever seen, with a unique index so
+    membership checks are a single index lookup instead of a scan of the
+    CSV snapshots. `participants` holds one row per (alphagrowth link, display
+    name) and `appearances` links them to spaces with the role as scraped
+    ('hosts' / 'speakers'), in the order rows were written.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+
+    def _migrate(self):
+        # Databases created before participants were stored lack spaces.scraped_at
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(spaces)')]
+        if columns and 'scraped_at' not in columns:
+            self.conn.execute('ALTER TABLE spaces ADD COLUMN scraped_at TEXT')
+
+        # Older databases keyed appearances by (space, participant, role), whose implicit
+        # rowids SQLite reuses after a rescrape deletes the newest rows; copy them into the
+        # AUTOINCREMENT table, keeping their write order as the ids
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(appearances)')]
+        if columns and 'id' not in columns:
+            self.conn.executescript(f"""
+                BEGIN;
+                ALTER TABLE appearances RENAME TO appearances_old;
+                DROP INDEX IF EXISTS appearances_participant;
+                DROP INDEX IF EXISTS appearances_scraped_at;
+                {APPEARANCES_TABLE}
+                INSERT INTO appearances (id, space_id, participant_id, role, scraped_at)
+                    SELECT rowid, space_id, participant_id, role, scraped_at FROM appearances_old ORDER BY rowid;
+                DROP TABLE appearances_old;
+                COMMIT;
+            """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.count_spaces()
+
+    def __contains__(self, url):
+        return self.has_space(url)
+
+    def has_space(self, url):
+        return self.conn.execute('SELECT 1 FROM spaces WHERE url = ?', (url,)).fetchone() is not None
+
+    def count_spaces(self):
+        return self.conn.execute('SELECT COUNT(*) FROM spaces').fetchone()[0]
+
+    def add_spaces(self, urls):
+        """Insert URLs that are not known yet; returns how many were new."""
+        now = datetime.now().isoformat()
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO spaces (url, first_seen) VALUES (?, ?)',
+                                  ((url, now) for url in urls))
+        return self.conn.total_changes - before
+
+    def _space_id(self, url, now):
+        self.conn.execute('INSERT OR IGNORE INTO spaces (url, first_seen) VALUES (?, ?)', (url, now))
+        return self.conn.execute('SELECT id FROM spaces WHERE url = ?', (url,)).fetchone()[0]
+
+    def _participant_id(self, participant):
+        self.conn.execute(
+            'INSERT INTO participants (name, alphagrowth_link, twitter_link) VALUES (?, ?, ?) '
+            'ON CONFLICT (alphagrowth_link, name) DO UPDATE SET '
+            'twitter_link = COALESCE(excluded.twitter_link, participants.twitter_link)',
+            (participant['name'], participant['alphagrowth_link'], participant['twitter_link']))
+        return self.conn.execute('SELECT id FROM participants WHERE alphagrowth_link = ? AND name = ?',
+                                 (participant['alphagrowth_link'], participant['name'])).fetchone()[0]
+
+    def _record_participants(self, space_url, participants, scraped_at):
+        space_id = self._space_id(space_url, scraped_at)
+        # A rescrape replaces the space's previous appearances
+        self.conn.execute('DELETE FROM appearances WHERE space_id = ?', (space_id,))
+        self.conn.execute('UPDATE spaces SET scraped_at = ? WHERE id = ?', (scraped_at, space_id))
+        for role in ['hosts', 'speakers']:
+            for participant in participants[role]:
+                self.conn.execute('INSERT OR IGNORE INTO appearances (space_id, participant_id, role, scraped_at) '
+                                  'VALUES (?, ?, ?, ?)',
+                                  (space_id, self._participant_id(participant), role, scraped_at))
+
+    def record_participants(self, space_url, participants, scraped_at=None):
+        """Store the hosts/speakers scraped from one space in a single transaction."""
+        with self.conn:
+            self._record_participants(space_url, participants, scraped_at or datetime.now().isoformat())
+
+    def _needs_import(self, path):
+        stat = os.stat(path)
+        row = self.conn.execute('SELECT size, mtime FROM imported_files WHERE filename = ?',
+                                (os.path.basename(path),)).fetchone()
+        return row is None or row != (stat.st_size, stat.st_mtime)
+
+    def mark_imported(self, path):
+        stat = os.stat(path)
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO imported_files (filename, size, mtime, imported_at) '
+                              'VALUES (?, ?, ?, ?)',
+                              (os.path.basename(path), stat.st_size, stat.st_mtime, datetime.now().isoformat()))
+
+    def merge_space_snapshots(self, data_dir=DATA_DIR):
+        """Fold every new or changed space_urls*.csv snapshot into `spaces`; returns the number of new URLs."""
+        added = 0
+        for filename in sorted(os.listdir(data_dir)):
+            if not (filename.startswith('space_urls') and filename.endswith('.csv')):
+                continue
+            path = os.path.join(data_dir, filename)
+            if not self._needs_import(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                added += self.add_spaces(row['url'] for row in csv.DictReader(f))
+            self.mark_imported(path)
+        return added
+
+    def merge_participant_snapshots(self, data_dir=DATA_DIR):
+        """Fold every new or changed participants_*.csv into the database; returns the number of spaces imported."""
+        imported = 0
+        for filename in sorted(os.listdir(data_dir)):
+            if not (filename.startswith('participants_') and filename.endswith('.csv')):
+                continue
+            path = os.path.join(data_dir, filename)
+            if not self._needs_import(path):
+                continue
+            try:
+                scraped_at = datetime.strptime(filename[len('participants_'):-len('.csv')], '%Y%m%d').isoformat()
+            except ValueError:
+                scraped_at = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+
+            # Group the flat CSV rows back into one record per space
+            spaces = {}
+            with open(path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    record = spaces.setdefault(row['space_url'], {'hosts': [], 'speakers': []})
+                    if row['role'] in record:
+                        record[row['role']].append({
+                            'name': row['name'],
+                            'alphagrowth_link': row['alphagrowth_link'],
+                            'twitter_link': row['twitter_link'] or None,
+                        })
+            with self.conn:
+                for space_url, participants in spaces.items():
+                    self._record_participants(space_url, participants, scraped_at)
+            self.mark_imported(path)
+            imported += len(spaces)
+        return imported
+
+    def merge_snapshots(self, data_dir=DATA_DIR):
+        """Import every CSV snapshot in `data_dir` that has not been imported yet."""
+        return self.merge_space_snapshots(data_dir), self.merge_participant_snapshots(data_dir)
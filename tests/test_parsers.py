@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from parsers import parse_participants  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'space_pages')
+PAGES = sorted(name for name in os.listdir(PAGES_DIR) if name.endswith('.html'))
+
+# Names each saved page should yield, so parity is not satisfied by both backends finding nothing
+EXPECTED_NAMES = {
+    'comment_sibling.html': {'hosts': ['Commented Host'], 'speakers': []},
+    'hosts_and_speakers.html': {'hosts': ['DeFi Daily'],
+                                'speakers': ['Alice Chen', 'José Muñoz & Co', 'No Twitter Yet']},
+    'missing_speaker_section.html': {'hosts': ['Solo Host'], 'speakers': []},
+    'nested_header_text.html': {'hosts': ['Nested Host'], 'speakers': ['Second Speaker']},
+    'no_sections.html': {'hosts': [], 'speakers': []},
+}
+
+
+def read_page(name):
+    with open(os.path.join(PAGES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_bs4_extracts_expected_participants(name):
+    result = parse_participants(read_page(name), name, backend='bs4')
+    assert {role: [p['name'] for p in result[role]] for role in result} == EXPECTED_NAMES[name]
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_lxml_matches_bs4(name):
+    pytest.importorskip('lxml')
+    html = read_page(name)
+    assert parse_participants(html, name, backend='lxml') == parse_participants(html, name, backend='bs4')